@@ -0,0 +1,87 @@
+"""
+画像アセットのキャッシュ
+各画像ファイルはディスクから1度だけ読み込み，画面（display）ができていれば
+convert()/convert_alpha()して，拡大・反転・回転したものも含めて使い回す
+"""
+import os
+
+import pygame as pg
+
+
+_cache: dict[tuple[str, float, float, tuple[bool, bool]], pg.Surface] = {}
+
+
+def _load(path: str) -> pg.Surface:
+    """
+    画像ファイルを読み込み，画面があれば画面のピクセル形式に変換する
+    透過PNGはconvert_alpha()，カラーキー付きの画像はconvert()してRLE圧縮を有効にする
+    引数 path：画像ファイルのパス
+    """
+    img = pg.image.load(path)
+    if pg.display.get_surface() is None:  # 画面がないと変換できないのでそのまま使う
+        return img
+    if img.get_flags() & pg.SRCALPHA:
+        return img.convert_alpha()
+    colorkey = img.get_colorkey()
+    img = img.convert()
+    if colorkey is not None:
+        img.set_colorkey(colorkey, pg.RLEACCEL)
+    return img
+
+
+def image(path: str, angle: float = 0, scale: float = 1.0, flip: tuple[bool, bool] = (False, False)) -> pg.Surface:
+    """
+    画像Surfaceをキャッシュから返す（初回だけ読み込みと変形を行う）
+    返すSurfaceは共有されるので，呼び出し側で書き換えないこと
+    引数1 path：画像ファイルのパス
+    引数2 angle：回転角度[度]
+    引数3 scale：拡大率
+    引数4 flip：（左右反転するか，上下反転するか）
+    戻り値：反転してから回転・拡大した画像Surface
+    """
+    angle = round(angle%360, 6)  # -45度と315度などを同じ画像として扱う
+    key = (path, angle, scale, flip)
+    img = _cache.get(key)
+    if img is None:
+        if key == (path, 0, 1.0, (False, False)):
+            img = _load(path)
+        else:
+            img = image(path)
+            if flip != (False, False):
+                img = pg.transform.flip(img, *flip)
+            if angle != 0 or scale != 1.0:
+                if img.get_colorkey() is not None and pg.display.get_surface() is not None:
+                    img = img.convert_alpha()  # カラーキーのまま回転すると透過部分が黒くなる
+                img = pg.transform.rotozoom(img, angle, scale)
+        _cache[key] = img
+    return img
+
+
+def rotations(path: str, scale: float = 1.0, flip: tuple[bool, bool] = (False, False), steps: int = 8) -> dict[float, pg.Surface]:
+    """
+    画像を360/steps度刻みで回転したものをまとめて作ってキャッシュする
+    引数1 path：画像ファイルのパス
+    引数2 scale：拡大率
+    引数3 flip：（左右反転するか，上下反転するか）
+    引数4 steps：回転の分割数（8なら45度刻み）
+    戻り値：{回転角度[度]: 画像Surface}の辞書
+    """
+    return {360*i/steps: image(path, 360*i/steps, scale, flip) for i in range(steps)}
+
+
+def preload(directory: str = "fig"):
+    """
+    ディレクトリ内の画像をすべて読み込んでおき，ゲーム中にディスクを読まないようにする
+    画面（pg.display.set_mode）を作った後に呼ぶ
+    引数 directory：画像ファイルのディレクトリ
+    """
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith((".png", ".jpg", ".gif")):
+            image(f"{directory}/{name}")
+
+
+def clear():
+    """
+    キャッシュを空にする（画面のピクセル形式が変わったときなど）
+    """
+    _cache.clear()
@@ -0,0 +1,175 @@
+"""
+こうかとんゲームの一括シミュレーション
+パラメータの組ごと・乱数シードごとに，画面なしのゲームを自動操作（controller.py）で最後まで（または指定tick数まで）回し，
+到達ラウンド，生存tick数，スコア，スプライト数の最大値，1tickの処理時間をCSVに書き出す
+ゲームはmultiprocessingのプロセスプールで並列に回す（ゲーム同士は何も共有しない）
+
+パラメータは「対象.属性=値」の形で指定する
+  対象：mode（ゲームモードengine.Mode），game（Gameの属性），round（Round），bird（こうかとん），
+        敵機の種類（ゲームモードの敵機の種類の表game.mode.archetypesのalien，big_slimeなど），またはクラス名（Beam，Bombなど）
+  例：mode.spawn_interval=150，mode.heart_interval=1000，mode.laser_round=2，bird.damege=2，alien.hp=5，big_slime.hp=3
+  （mode.hpのように，Gameを作るときだけ使う値は変えても効かないのでエラーにする．bird.HP_lifeなどを変える）
+
+使い方：python batch.py --game legend --bot bot --seeds 32 --set base: --set fast:mode.spawn_interval=100,alien.hp=4 --output batch.csv
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # pg.init()より前に設定する
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # 各プロセスがpygameのあいさつを出力に混ぜないようにする
+import pygame as pg
+
+import assets
+from controller import CONTROLLERS
+from benchmark import GAMES, ORIGIN, percentile
+from instrument import GROUPS
+import engine
+
+
+FIXED = ["mode.name", "mode.caption", "mode.hp", "mode.archetypes"]  # Gameを作るときだけ使うので，変えても効かない値
+
+
+def parse_set(text: str) -> tuple[str, dict]:
+    """
+    「名前:対象.属性=値,対象.属性=値」の形のパラメータの組を(名前, {対象.属性: 値})にする
+    値はJSONとして読めればその値（数値など），読めなければ文字列とする
+    """
+    name, _, body = text.partition(":")
+    params = {}
+    for item in filter(None, body.split(",")):
+        key, _, value = item.partition("=")
+        try:
+            params[key.strip()] = json.loads(value)
+        except json.JSONDecodeError:
+            params[key.strip()] = value.strip()
+    return name, params
+
+
+def apply(mod, game, params: dict) -> list[tuple[object, str, object]]:
+    """
+    パラメータをゲームに設定する
+    引数1 mod：ゲームのモジュール（engine）
+    引数2 game：設定するゲーム
+    引数3 params：{対象.属性: 値}の辞書
+    戻り値：元に戻すための(対象, 属性, 元の値)のリスト（クラスの属性はプロセス内で共有されるため）
+    """
+    undo = []
+    for key, value in params.items():
+        name, attr = key.split(".")
+        target = ({"mode": game.mode, "game": game, "round": game.round, "bird": game.bird}.get(name)
+                  or game.mode.archetypes.get(name) or getattr(mod, name))
+        undo.append((target, attr, getattr(target, attr)))
+        setattr(target, attr, value)
+    return undo
+
+
+def init_worker():
+    """
+    プロセスプールの各プロセスで1回だけ，pygameと画像を準備する
+    """
+    pg.init()
+    pg.display.set_mode((1600, 900))
+
+
+def run(job: tuple[str, str, dict, int, int, str]) -> dict:
+    """
+    1ゲームを回して結果を返す（プロセスプールの各プロセスで呼ばれる）
+    引数 job：(ゲーム名, パラメータの組の名前, パラメータ, 乱数シード, 最大tick数, コントローラの名前)
+    """
+    game_name, name, params, seed, ticks, bot = job
+    assets.preload("fig")
+    game = engine.Game(seed=seed, mode=engine.MODES[game_name])
+    undo = apply(engine, game, params)
+    controller = CONTROLLERS[bot]()
+    peaks = dict.fromkeys(GROUPS, 0)
+    costs = []
+    alive = True
+    try:
+        while alive and game.tmr < ticks:
+            keys, events = controller.control(game)
+            t0 = time.perf_counter()
+            for event in events:
+                game.handle_event(event)
+            alive = game.update(keys)
+            costs.append(time.perf_counter()-t0)
+            for group in GROUPS:
+                peaks[group] = max(peaks[group], len(getattr(game, group)))
+    finally:
+        for target, attr, value in reversed(undo):
+            setattr(target, attr, value)
+    ms = sorted(sec*1000 for sec in costs)
+    return {
+        "game": game_name,
+        "set": name,
+        "bot": bot,
+        "params": json.dumps(params, sort_keys=True),
+        "seed": seed,
+        "ticks": game.tmr,
+        "survived": alive,
+        "round": game.round.round,
+        "score": game.score.value,
+        "hp": game.bird.HP_life,
+        "damege": game.bird.damege,
+        "tick_ms_mean": sum(ms)/len(ms) if ms else 0.0,
+        "tick_ms_p95": percentile(ms, 95),
+        "tick_ms_max": ms[-1] if ms else 0.0,
+        **{f"peak_{group}": peaks[group] for group in GROUPS},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="こうかとんゲームをパラメータと乱数シードを変えて一括で回す")
+    parser.add_argument("--game", choices=GAMES, default="legend")
+    parser.add_argument("--bot", choices=[name for name in CONTROLLERS if name != "keyboard"], default="bot",
+                        help="自動操作（botは避けて狙い撃つ参考実装，sweepは左右に往復して撃つだけ）")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME:KEY=VALUE,...",
+                        help="パラメータの組（複数指定できる．省略すると既定値の組だけ）")
+    parser.add_argument("--seeds", type=int, default=8, help="パラメータの組ごとに回すゲームの数")
+    parser.add_argument("--seed-start", type=int, default=0, help="最初の乱数シード")
+    parser.add_argument("--ticks", type=int, default=30000, help="1ゲームの最大tick数")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="並列に回すプロセス数")
+    parser.add_argument("--output", default="batch.csv", help="結果を書き出すCSVファイル")
+    args = parser.parse_args()
+    output = os.path.join(ORIGIN, args.output)
+    if args.seeds < 1:
+        parser.error("--seedsは1以上にしてください")
+
+    sets = [parse_set(text) for text in args.set] or [("default", {})]
+    for name, params in sets:
+        fixed = [key for key in params if key in FIXED]
+        if fixed:
+            parser.error(f"{name}: {', '.join(fixed)} は変えても効かない（bird.HP_life，big_slime.hpなどを変える）")
+    jobs = [(args.game, name, params, seed, args.ticks, args.bot)
+            for name, params in sets for seed in range(args.seed_start, args.seed_start+args.seeds)]
+    start = time.perf_counter()
+    # pygameをimportした後のforkは固まることがあるので，各プロセスは新しく起動する
+    with multiprocessing.get_context("spawn").Pool(args.jobs, initializer=init_worker) as pool:
+        rows = list(pool.imap_unordered(run, jobs))
+        pool.close()
+        pool.join()  # 終了時のterminate()では，pygameを初期化したプロセスが終わらないことがある
+    elapsed = time.perf_counter()-start
+    rows.sort(key=lambda row: ([name for name, _ in sets].index(row["set"]), row["seed"]))
+
+    with open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(rows)} games in {elapsed:.1f} s with {args.jobs} processes "
+          f"({sum(row['ticks'] for row in rows)/elapsed:.0f} ticks/s)")
+    for name, _ in sets:
+        res = [row for row in rows if row["set"] == name]
+        print(f"{name:>12}: round {sum(r['round'] for r in res)/len(res):.2f}  "
+              f"ticks {sum(r['ticks'] for r in res)/len(res):.0f}  "
+              f"score {sum(r['score'] for r in res)/len(res):.1f}  "
+              f"survived {sum(r['survived'] for r in res)}/{len(res)}  "
+              f"tick {sum(r['tick_ms_mean'] for r in res)/len(res):.3f} ms")
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+こうかとんゲームのベンチマーク
+決まったシナリオを乱数シード固定で指定フレーム数だけ回し，
+スプライトグループごとのupdate/draw時間のp50/p95/p99をJSONに書き出す
+
+使い方：python benchmark.py --game legend --frames 2000 --seed 0 --output bench_result.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # pg.init()より前に設定する
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame as pg
+
+import assets
+from instrument import GROUPS, MethodTimer
+
+ORIGIN = os.getcwd()  # 起動したときのカレントディレクトリ（engineはimport時にカレントディレクトリを移動する）
+import engine
+
+
+GAMES = list(engine.MODES)  # ゲームモードの名前
+POOLS = ["beam", "bomb", "exp"]
+
+
+class Timings(MethodTimer):
+    """
+    ゲームオブジェクトのメソッドを計測用に包み，フレームごとの所要時間を集計するクラス
+    """
+    def __init__(self):
+        super().__init__()
+        self.samples = defaultdict(list)  # 区間ごとの全フレームの時間[s]
+
+    def add(self, key: str, sec: float):
+        """
+        区間keyに計測済みの時間secを加算する
+        """
+        self.totals[key] = self.totals.get(key, 0.0)+sec
+
+    def end_frame(self):
+        """
+        現在フレームの計測値を確定し，次のフレームに備えて0に戻す
+        """
+        for key, sec in self.totals.items():
+            self.samples[key].append(sec)
+            self.totals[key] = 0.0
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        区間ごとのp50/p95/p99/平均/最大をミリ秒で返す
+        """
+        return {key: summarize(values) for key, values in sorted(self.samples.items())}
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    ソート済みリストvaluesの下からp%の値を最近傍順位法で返す
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values)-1, math.ceil(p*len(values)/100)-1))
+    return values[rank]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """
+    秒単位の計測値リストをミリ秒単位の統計値にまとめる
+    """
+    ms = sorted(v*1000 for v in values)
+    return {
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "mean": sum(ms)/len(ms) if ms else 0.0,
+        "max": ms[-1] if ms else 0.0,
+    }
+
+
+def setup_round1(mod, game):
+    """ラウンド1：Enemyのみ"""
+    for _ in range(8):
+        game.emys.add(mod.Enemy(game.mode.archetypes["alien"]))
+
+
+def setup_round2(mod, game):
+    """ラウンド2：大きいスライムが分裂する"""
+    game.round.round = 2
+    for _ in range(8):
+        game.emys.add(mod.Enemy(game.mode.archetypes["big_slime"]))
+
+
+def setup_round4(mod, game):
+    """ラウンド4：敵機がEnemy_Beamを撃つ"""
+    setup_round2(mod, game)
+    game.round.round = 4
+
+
+def setup_gravity(mod, game):
+    """重力場が常に発動している"""
+    setup_round2(mod, game)
+    game.gravity.add(mod.Gravity(10**9))
+
+
+def setup_hyper(mod, game):
+    """こうかとんが常に無敵状態"""
+    setup_round2(mod, game)
+    game.bird.hyper_life = 10**9
+
+
+def setup_barrage(mod, game):
+    """弾幕：多数の敵機が毎フレーム爆弾を投下し，画面上に数千発の爆弾が飛ぶ"""
+    for _ in range(40):
+        emy = mod.Enemy(game.mode.archetypes["alien"])
+        emy.interval = 1
+        game.emys.add(emy)
+
+
+SCENARIOS = {
+    "round1": setup_round1,
+    "round2": setup_round2,
+    "round4": setup_round4,
+    "gravity": setup_gravity,
+    "hyper": setup_hyper,
+    "barrage": setup_barrage,
+}
+
+
+def scripted_keys(tmr: int) -> defaultdict:
+    """
+    ベンチマーク用のこうかとんの操作：150フレームごとに左右の移動を切り替える
+    戻り値：pg.key.get_pressed()の代わりに使うキー状態
+    """
+    keys = defaultdict(bool)
+    keys[pg.K_LEFT if tmr//150%2 else pg.K_RIGHT] = True
+    return keys
+
+
+def run_scenario(mod, name: str, frames: int, seed: int, screen: pg.Surface, bg_img: pg.Surface,
+                 brute_force: bool = False, vectorized: bool = False, mode: str = "legend") -> dict:
+    """
+    シナリオnameをframesフレーム回して計測結果を返す
+    引数1 mod：ゲームのモジュール（engine）
+    引数2 name：シナリオ名
+    引数3 frames：計測するフレーム数
+    引数4 seed：乱数シード
+    引数5 screen：描画先Surface
+    引数6 bg_img：背景画像Surface
+    引数7 brute_force：Trueなら衝突判定を総当たりで行う
+    引数8 vectorized：Trueなら爆弾とビームをNumPyの配列でまとめて動かす
+    引数9 mode：ゲームモードの名前（engine.MODES）
+    """
+    random.seed(seed)
+    game = mod.Game(brute_force, vectorized, mode=mod.MODES[mode])
+    bird = game.bird
+    bird.HP_limit = bird.HP_life = 10**9  # 計測途中でゲームオーバーにならないようにする
+    SCENARIOS[name](mod, game)
+    game.next_round = lambda: None  # ラウンドを進めず，シナリオで決めたラウンドのまま計測する
+
+    timings = Timings()
+    timings.wrap_game(game)
+    timings.wrap(game, "spawn", "spawn")
+    timings.wrap(bird, "draw", "draw.bird")
+
+    fire = pg.event.Event(pg.KEYDOWN, key=pg.K_SPACE)
+    aims = [(0, -1), (+1, -1), (-1, -1)]
+    peaks = defaultdict(int)
+    start = time.perf_counter()
+    for tmr in range(frames):
+        if tmr%5 == 0:  # 5フレームに1回，上方向へビームを撃つ
+            bird.dire = aims[tmr//5%len(aims)]
+            game.handle_event(fire)
+        t0 = time.perf_counter()
+        game.update(scripted_keys(tmr))
+        t1 = time.perf_counter()
+        screen.blit(bg_img, [0, 0])
+        game.draw(screen)
+        t2 = time.perf_counter()
+        timings.add("frame.update", t1-t0)
+        timings.add("frame.draw", t2-t1)
+        timings.end_frame()
+        for group in GROUPS:
+            peaks[group] = max(peaks[group], len(getattr(game, group)))
+    elapsed = time.perf_counter()-start
+    return {
+        "frames": frames,
+        "seed": seed,
+        "elapsed_s": elapsed,
+        "fps": frames/elapsed if elapsed > 0 else 0.0,
+        "round": game.round.round,
+        "peak_sprites": dict(peaks),
+        "pools": {name: getattr(game, f"{name}_pool").stats() for name in POOLS},
+        "timings_ms": timings.summary(),
+    }
+
+
+def git_commit() -> str|None:
+    """
+    計測したソースのgitコミットIDを返す（取得できなければNone）
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="こうかとんゲームのフレーム時間ベンチマーク")
+    parser.add_argument("--game", choices=[*GAMES, "all"], default="all")
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--brute-force", action="store_true", help="衝突判定を空間ハッシュではなく総当たりで行う")
+    parser.add_argument("--numpy", action="store_true", help="爆弾とビームをNumPyの配列でまとめて動かす")
+    parser.add_argument("--output", default="bench_result.json", help="結果を書き出すJSONファイル")
+    args = parser.parse_args()
+    output = os.path.join(ORIGIN, args.output)
+
+    pg.init()
+    screen = pg.display.set_mode((1600, 900))
+    games = list(GAMES) if args.game == "all" else [args.game]
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    result = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pg.version.ver,
+        "frames": args.frames,
+        "seed": args.seed,
+        "brute_force": args.brute_force,
+        "numpy": args.numpy,
+        "games": {},
+    }
+    assets.preload("fig")
+    bg_img = assets.image("fig/pg_bg.jpg")
+    for game_name in games:
+        result["games"][game_name] = {}
+        for name in names:
+            res = run_scenario(engine, name, args.frames, args.seed, screen, bg_img, args.brute_force, args.numpy, game_name)
+            result["games"][game_name][name] = res
+            upd, drw = res["timings_ms"]["frame.update"], res["timings_ms"]["frame.draw"]
+            print(f"{game_name:>6} {name:>8}: {res['fps']:7.0f} fps  "
+                  f"update p50/p95/p99 {upd['p50']:.2f}/{upd['p95']:.2f}/{upd['p99']:.2f} ms  "
+                  f"draw p50/p95/p99 {drw['p50']:.2f}/{drw['p95']:.2f}/{drw['p99']:.2f} ms")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"wrote {output}")
+    pg.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+こうかとんの操作（コントローラ）
+毎tick，pg.key.get_pressed()の代わりになる押下キーと，ゲームに渡すキー入力イベントを決める
+自動操作もキーボードと同じ押下キーとイベントだけでゲームを動かすので，そのまま記録・再生できる
+
+Controller：コントローラの基底クラス（control(game)を実装する）
+Keyboard：キーボードの押下キーをそのまま使う（イベントはメインループがpg.event.get()で処理する）
+Sweep：左右に往復しながら一定間隔でビームを撃つだけの簡単な自動操作
+Bot：爆弾とレーザーを避け，最も近い敵機を狙って撃ち，スコアに余裕があれば無敵・防御壁・重力場を使う自動操作
+"""
+import math
+
+import pygame as pg
+
+
+DIRECTION = {  # 押下キーと移動方向（Bird.deltaと同じ）
+    pg.K_UP: (0, -1),
+    pg.K_DOWN: (0, +1),
+    pg.K_LEFT: (-1, 0),
+    pg.K_RIGHT: (+1, 0),
+}
+MOVES = [(0, 0)] + [(dx, dy) for dx in (-1, 0, +1) for dy in (-1, 0, +1) if dx or dy]  # 止まる＋8方向
+
+
+def press(game, move: tuple[int, int] = (0, 0), shift: bool = False) -> dict[int, bool]:
+    """
+    move方向に動くときの押下キーの辞書を作る
+    引数1 game：操作するゲーム（game.keysのキーを並べる）
+    引数2 move：移動方向（(0, 0)なら何も押さない）
+    引数3 shift：Trueなら左Shiftも押す（速度2倍）
+    戻り値：pg.key.get_pressed()の代わりに使う押下キーの辞書
+    """
+    keys = dict.fromkeys(game.keys, False)
+    for key, (dx, dy) in DIRECTION.items():
+        if (dx and dx == move[0]) or (dy and dy == move[1]):
+            keys[key] = True
+    keys[pg.K_LSHIFT] = shift
+    return keys
+
+
+def keydown(key: int) -> pg.event.Event:
+    """
+    キーが押されたイベントを作る
+    """
+    return pg.event.Event(pg.KEYDOWN, key=key)
+
+
+class Controller:
+    """
+    こうかとんを操作するクラスの基底
+    サブクラスはcontrol(game)を持ち，次のtickの操作を決めること（メインループがgame.update()の前に1回呼ぶ）
+    control(game)の引数 game：操作するゲーム（読むだけで，状態は変えない）
+    control(game)の戻り値：(押下キー, このtickの前にgame.handle_event()へ渡すイベントのリスト)
+    """
+
+
+class Keyboard(Controller):
+    """
+    キーボードでの操作
+    """
+    def control(self, game) -> tuple[list[bool], list[pg.event.Event]]:
+        return pg.key.get_pressed(), []
+
+
+class Sweep(Controller):
+    """
+    簡単な自動操作：150tickごとに左右の移動を切り替え，5tickに1回，上・右上・左上へ順にビームを撃つ
+    撃つ1tick前にその方向のキーを押して向きを変える
+    """
+    aims = [(0, -1), (+1, -1), (-1, -1)]
+
+    def control(self, game) -> tuple[dict[int, bool], list[pg.event.Event]]:
+        tmr = game.tmr
+        if tmr%5 == 4:
+            return press(game, __class__.aims[(tmr+1)//5%3]), []
+        return press(game, (-1 if tmr//150%2 else +1, 0)), [keydown(pg.K_SPACE)] if tmr%5 == 0 else []
+
+
+class Bot(Controller):
+    """
+    参考実装の自動操作
+    近くの爆弾は衝突判定と同じCollider.spritecollideで拾い，数tick先の位置を直線で予測して，
+    ぶつからない移動（止まる，8方向，Shiftで2倍速）を選ぶ．太くなる直前のレーザーも避ける
+    危険がなければ最も近い敵機の方向（8方向のうち最も近いもの）に向きを合わせてビームを撃つ
+    避けきれないときはスコアを使って無敵（k）か防御壁（右Shift）を，敵機が多いときは重力場（g）を使う
+    """
+    def __init__(self, bound: tuple[int, int] = (1600, 900), reach: int = 200, horizon: int = 10,
+                 margin: int = 10, fire_every: int = 4, aim_error: float = 8.0):
+        """
+        引数1 bound：画面の（幅，高さ）
+        引数2 reach：こうかとんから何ピクセル以内の爆弾を避ける対象にするか
+        引数3 horizon：何tick先まで予測するか
+        引数4 margin：こうかとんRectを広げて判定する余裕[px]
+        引数5 fire_every：ビームを撃つ間隔[tick]
+        引数6 aim_error：狙いのずれがこの角度[度]以内なら撃つ
+        """
+        self.bound = pg.Rect(0, 0, *bound)
+        self.reach = reach
+        self.horizon = horizon
+        self.margin = margin
+        self.fire_every = fire_every
+        self.aim_error = aim_error
+        self.probe = pg.sprite.Sprite()  # 近くの爆弾を探すための，こうかとんを中心とする大きなRect
+        self.probe.rect = pg.Rect(0, 0, 0, 0)
+        self.fired = -fire_every  # 最後にビームを撃ったtick
+
+    def danger(self, rect: pg.Rect, move: tuple[int, int], speed: int, bombs: list, lasers: list,
+               horizon: int|None = None) -> int:
+        """
+        rectのこうかとんがmove方向に動き続けたときの危険度（早くぶつかるほど大きい）
+        引数1 rect：こうかとんRect
+        引数2 move：移動方向
+        引数3 speed：1回の移動量（Game.updateはこうかとんを1tickに2回動かす）
+        引数4 bombs：近くの爆弾の(Rect, 1tickのx移動量, 1tickのy移動量)のリスト
+        引数5 lasers：これから当たり判定を持つレーザーのリスト
+        引数6 horizon：何tick先まで予測するか（Noneならself.horizon）
+        """
+        horizon = self.horizon if horizon is None else horizon
+        step = (2*speed*move[0], 2*speed*move[1])
+        cur = rect
+        total = 0
+        for h in range(1, horizon+1):
+            nxt = cur.move(step)
+            if self.bound.contains(nxt):  # 画面外には出られない（Bird.updateと同じ）
+                cur = nxt
+            test = cur.inflate(self.margin, self.margin)
+            weight = horizon+1-h
+            for brect, vx, vy in bombs:
+                if test.colliderect(brect.move(vx*h, vy*h)):
+                    total += weight
+            for laser in lasers:
+                if laser.hits(test, laser.bold_hit):
+                    total += 2*weight
+        return total
+
+    def target(self, game, center: tuple[int, int]) -> tuple[tuple[int, int], float]|None:
+        """
+        こうかとんの中心がcenterにあるとき，最も近い敵機を狙う向きを決める
+        戻り値：(8方向のうち最も近い向き, その向きとのずれ[度])．敵機がいなければNone
+        """
+        cx, cy = center
+        best = None
+        for emy in game.emys:
+            ex, ey = emy.rect.center
+            d2 = (ex-cx)**2+(ey-cy)**2
+            if best is None or d2 < best[0]:
+                best = d2, ex-cx, ey-cy
+        if best is None:
+            return None
+        angle = math.degrees(math.atan2(best[2], best[1]))
+        sector = round(angle/45)
+        rad = math.radians(sector*45)
+        return (round(math.cos(rad)), round(math.sin(rad))), abs(angle-sector*45)
+
+    def control(self, game) -> tuple[dict[int, bool], list[pg.event.Event]]:
+        bird, score = game.bird, game.score.value
+        rect = bird.rect
+        events = []
+        if score >= 300 and len(game.emys) >= 5 and not game.gravity:  # 重力場の分（200）を使っても余裕がある
+            events.append(keydown(pg.K_g))
+            score -= 200
+
+        self.probe.rect = rect.inflate(2*self.reach, 2*self.reach)
+        if bird.state == "normal":
+            bombs = [(bomb.rect, bomb.speed*bomb.vx, bomb.speed*bomb.vy)
+                     for bomb in game.collider.spritecollide(self.probe, game.bombs, False)]
+            lasers = [laser for laser in game.e_beam
+                      if laser.bold >= laser.bold_hit-1 and laser.rect.colliderect(self.probe.rect)]
+        else:  # 無敵の間は何にも当たらない
+            bombs, lasers = [], []
+        threats = bool(bombs or lasers)
+
+        if threats and self.danger(rect, (0, 0), 5, bombs, lasers):
+            # 止まっていると当たるので，最も安全な移動を選ぶ（同じなら遅い方）
+            risk, speed, move = min((self.danger(rect, move, speed, bombs, lasers), speed, move)
+                                    for speed in (5, 10) for move in MOVES)
+            if risk and self.danger(rect, move, speed, bombs, lasers, 3):  # どう動いても3tick以内に当たる
+                if score >= 100:
+                    events.append(keydown(pg.K_k))
+                elif score >= 50 and not game.shields:
+                    events.append(keydown(pg.K_RSHIFT))
+            return press(game, move, speed == 10), events
+
+        aim = self.target(game, rect.center)
+        if aim is None:
+            return press(game), events
+        dire, error = aim
+        if error > self.aim_error:  # 狙いがずれているので，ずれが小さくなる方へ安全に動けるなら動く
+            cx, cy = rect.center
+            move = min(MOVES, key=lambda mv: self.target(game, (cx+10*mv[0], cy+10*mv[1]))[1])
+            if move != (0, 0) and not (threats and self.danger(rect, move, 5, bombs, lasers)):
+                return press(game, move), events
+        if bird.dire != dire:  # 撃つ前に向きを合わせる（狙う方向へ1tick動く）
+            if not (threats and self.danger(rect, dire, 5, bombs, lasers)):
+                return press(game, dire), events
+        elif game.tmr-self.fired >= self.fire_every:
+            self.fired = game.tmr
+            events.append(keydown(pg.K_SPACE))
+        return press(game), events
+
+
+CONTROLLERS = {"keyboard": Keyboard, "sweep": Sweep, "bot": Bot}
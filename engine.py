@@ -0,0 +1,1329 @@
+"""
+こうかとんゲームの本体（kokaton_legend.pyとmusou_kokaton.pyで共通）
+2つのゲームの違い（初期HP，スライムの体力，アイテムの出現間隔，レーザーを撃ち始めるラウンドなど）は
+ゲームモード（Mode）の値だけで表し，処理はすべてこのモジュールの1つのコードを使う
+"""
+import argparse
+import dataclasses
+import heapq
+import math
+import os
+import random
+import sys
+import time
+import zlib
+import pygame as pg
+
+import assets
+from controller import CONTROLLERS, Bot
+from overlay import PerfOverlay
+from pool import Pool, Pooled
+from profiler import SegmentProfiler
+from projectiles import Projectiles
+from replay import Recorder, Replay
+from spatial import Collider
+from telemetry import Telemetry
+
+
+WIDTH, HEIGHT = 1600, 900  # ゲームウィンドウの幅，高さ
+TICK_RATE = 50  # 1秒あたりのロジックの更新回数（ゲーム内の時間はすべてこの単位で数える）
+MAX_TICKS = 5  # 描画1回あたりに追いつくロジック更新の最大回数（これを超えた遅れは捨てる）
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclasses.dataclass
+class Archetype:
+    """
+    敵機の種類（画像，体力，速さ，爆弾投下インターバルの範囲，倒される前に分裂してできる敵機）
+    """
+    imgs: tuple[str, ...]  # 画像ファイル（出現時にランダムに選ぶ）
+    hp: int  # 体力
+    speed: int = 6  # 降下の速さ[px/フレーム]
+    interval: tuple[int, int] = (50, 300)  # 爆弾投下インターバル[フレーム]の範囲
+    split: tuple[tuple[str, int], ...] = ()  # ビームが当たると分裂してできる(種類, x方向のずれ)
+    x_first: bool = False  # 画像より先に出現位置のx座標を決める（乱数を引く順番を記録した操作に合わせる）
+
+
+ARCHETYPES = {  # 敵機の種類の既定の表（新しい敵機はここに足す．ゲームモードごとに値を変えられる）
+    "alien": Archetype(tuple(f"fig/alien{i}.png" for i in range(1, 4)), hp=3),
+    "big_slime": Archetype(("fig/suraim1.png",), hp=2, split=(("small_slime", -50), ("small_slime", +50)),
+                           x_first=True),
+    "small_slime": Archetype(("fig/suraim2.png",), hp=1),
+}
+
+
+@dataclasses.dataclass
+class Mode:
+    """
+    ゲームモード（ゲームごとに違う設定値）
+    Gameはモードのコピー（敵機の種類の表もコピーする）をgame.modeに持つので，
+    1ゲームだけ値を変えて試せる（batch.pyのmode.属性=値，big_slime.hp=値など）
+    """
+    name: str
+    caption: str = "真！こうかとん無双"  # ウィンドウのタイトル
+    hp: int = 5  # こうかとんの初期HP
+    spawn_interval: int = 200  # 敵機を出現させる間隔[フレーム]
+    heart_interval: int = 1500  # 回復アイテムを出現させる間隔[フレーム]
+    attack_up_interval: int = 0  # 攻撃力アップを出現させる間隔[フレーム]（0なら時間では出現させない）
+    laser_round: int = 4  # 敵機がレーザー（Enemy_Beam）も撃ち始めるラウンド
+    round_bonus: bool = True  # ラウンドが進むたびに攻撃力アップと回復アイテムを出現させるか
+    damege_up: int = 1  # 攻撃力アップを1つ拾ったときに上がる攻撃力
+    archetypes: dict[str, Archetype] = dataclasses.field(default_factory=lambda: dict(ARCHETYPES))  # 敵機の種類の表
+
+
+MODES = {
+    "legend": Mode("legend"),
+    "musou": Mode("musou", hp=3, heart_interval=1000, attack_up_interval=200, laser_round=1, round_bonus=False,
+                  archetypes=dict(ARCHETYPES, big_slime=dataclasses.replace(ARCHETYPES["big_slime"], hp=1))),
+}
+
+def check_bound(obj_rct:pg.Rect) -> tuple[bool, bool]:
+    """
+    Rectの画面内外判定用の関数
+    引数：こうかとんRect，または，爆弾Rect，またはビームRect
+    戻り値：横方向判定結果，縦方向判定結果（True：画面内／False：画面外）
+    """
+    yoko, tate = True, True
+    if obj_rct.left < 0 or WIDTH < obj_rct.right:  # 横方向のはみ出し判定
+        yoko = False
+    if obj_rct.top < 0 or HEIGHT < obj_rct.bottom:  # 縦方向のはみ出し判定
+        tate = False
+    return yoko, tate
+
+
+def calc_orientation(org: pg.Rect, dst: pg.Rect) -> tuple[float, float]:
+    """
+    orgから見て，dstがどこにあるかを計算し，方向ベクトルをタプルで返す
+    引数1 org：爆弾SurfaceのRect
+    引数2 dst：こうかとんSurfaceのRect
+    戻り値：orgから見たdstの方向ベクトルを表すタプル
+    """
+    x_diff, y_diff = dst.centerx-org.centerx, dst.centery-org.centery
+    norm = math.sqrt(x_diff**2+y_diff**2)
+    return x_diff/norm, y_diff/norm
+
+def collide_segment_rect(start: tuple[int, int], end: tuple[int, int], width: float, rct: pg.Rect) -> bool:
+    """
+    太さwidthの線分start-endとRectが重なっているかを判定する
+    引数1 start：線分の始点
+    引数2 end：線分の終点
+    引数3 width：線分の太さ
+    引数4 rct：判定するRect（こうかとんRectなど）
+    戻り値：重なっていればTrue
+    """
+    if rct.clipline(start, end):  # 線の中心線がRectを通過する
+        return True
+    r2 = (width/2)**2
+    # 交差しない場合の最短距離は「線分の端点とRect」か「Rectの角と線分」の間に現れる
+    for x, y in (start, end):
+        dx = max(rct.left-x, 0, x-rct.right)
+        dy = max(rct.top-y, 0, y-rct.bottom)
+        if dx*dx+dy*dy <= r2:
+            return True
+    sx, sy = start
+    ex, ey = end[0]-sx, end[1]-sy
+    length2 = ex*ex+ey*ey
+    for cx, cy in (rct.topleft, rct.topright, rct.bottomleft, rct.bottomright):
+        t = 0 if length2 == 0 else max(0, min(1, ((cx-sx)*ex+(cy-sy)*ey)/length2))
+        dx, dy = sx+t*ex-cx, sy+t*ey-cy
+        if dx*dx+dy*dy <= r2:
+            return True
+    return False
+
+
+class Label:
+    """
+    文字列が変わったときだけfont.renderし直す文字表示に関するクラス
+    値が同じフレームでは前回描画したSurfaceをそのまま使う
+    """
+    def __init__(self, font: pg.font.Font, color: tuple[int, int, int]):
+        """
+        引数1 font：描画に使うフォント
+        引数2 color：文字色
+        """
+        self.font = font
+        self.color = color
+        self.text = None
+        self.image = None
+
+    def render(self, text: str) -> pg.Surface:
+        """
+        文字列textを描画したSurfaceを返す（前回と同じ文字列なら描画し直さない）
+        引数 text：表示する文字列
+        """
+        if text != self.text:
+            self.text = text
+            self.image = self.font.render(text, 0, self.color)
+        return self.image
+
+
+class Bird(pg.sprite.Sprite):
+    """
+    ゲームキャラクター（こうかとん）に関するクラス
+    """
+    delta = {  # 押下キーと移動量の辞書
+        pg.K_UP: (0, -1),
+        pg.K_DOWN: (0, +1),
+        pg.K_LEFT: (-1, 0),
+        pg.K_RIGHT: (+1, 0),
+    }
+    def __init__(self, num: int, xy: tuple[int, int], hp: int = 5):
+        """
+        こうかとん画像Surfaceを生成する
+        引数1 num：こうかとん画像ファイル名の番号
+        引数2 xy：こうかとん画像の位置座標タプル
+        引数3 hp：初期HP
+        """
+        super().__init__()
+        path, flip = f"fig/{num}.png", (True, False)  # 左右反転したものがデフォルト（右向き）のこうかとん
+        self.imgs = {
+            (+1, 0): assets.image(path, 0, 2.0, flip),  # 右
+            (+1, -1): assets.image(path, 45, 2.0, flip),  # 右上
+            (0, -1): assets.image(path, 90, 2.0, flip),  # 上
+            (-1, -1): assets.image(path, -45, 2.0),  # 左上
+            (-1, 0): assets.image(path, 0, 2.0),  # 左
+            (-1, +1): assets.image(path, 45, 2.0),  # 左下
+            (0, +1): assets.image(path, -90, 2.0, flip),  # 下
+            (+1, +1): assets.image(path, -45, 2.0, flip),  # 右下
+        }
+        self.dire = (+1, 0)
+        self.image = self.imgs[self.dire]
+        self.rect = self.image.get_rect()
+        self.rect.center = xy
+        self.speed = 10
+        self.state = "normal"  # こうかとんの無敵モードかの判定
+        self.hyper_life = 0
+        # HP表示の初期設定
+        self.HP_limit = 5  # こうかとんの上限HP
+        self.HP_life = hp  # こうかとんの初期HP
+        self.damege = 1  # こうかとんの初期攻撃力
+        self.font = pg.font.Font(None, 50)
+        self.color = (255, 0, 0)
+        self.HP_label = Label(self.font, self.color)
+        self.HP_image = self.HP_label.render(f"HP: {self.HP_life}/ {self.HP_limit}")
+        self.HP_rect = self.HP_image.get_rect()
+        self.HP_rect.center = 400, HEIGHT - 50
+        self.damege_label = Label(self.font, self.color)
+        self.damege_image = self.damege_label.render(f'Damage: {self.damege}')
+        self.damege_rect = self.HP_image.get_rect()
+        self.damege_rect.center = 600, HEIGHT - 50
+
+    def change_img(self, num: int, screen: pg.Surface|None = None):
+        """
+        こうかとん画像を切り替え，画面に転送する
+        引数1 num：こうかとん画像ファイル名の番号
+        引数2 screen：画面Surface（Noneなら画像の切り替えのみ）
+        """
+        self.image = assets.image(f"fig/{num}.png", 0, 2.0)
+        if screen is not None:
+            screen.blit(self.image, self.rect)
+
+    def update(self, key_lst: list[bool]):
+        """
+        押下キーに応じてこうかとんを移動させる
+        引数 key_lst：押下キーの真理値リスト
+        """
+        sum_mv = [0, 0]
+        for k, mv in __class__.delta.items():
+            if key_lst[k]:
+                sum_mv[0] += mv[0]
+                sum_mv[1] += mv[1]
+            if key_lst[pg.K_LSHIFT]: # 左Shiftキーが押されている場合、速度を倍にする
+                self.speed = 10
+            else:
+                self.speed = 5
+        self.rect.move_ip(self.speed*sum_mv[0], self.speed*sum_mv[1])
+        if check_bound(self.rect) != (True, True):
+            self.rect.move_ip(-self.speed*sum_mv[0], -self.speed*sum_mv[1])
+        if not (sum_mv[0] == 0 and sum_mv[1] == 0):
+            self.dire = tuple(sum_mv)
+            self.image = self.imgs[self.dire]
+        if self.hyper_life > 0:
+            self.state = "hyper"
+            self.image = pg.transform.laplacian(self.image)
+            self.hyper_life -= 1
+        else:
+            self.state = "normal"
+
+    def draw(self, screen: pg.Surface) -> list[pg.Rect]:
+        """
+        こうかとんとHP，攻撃力の表示を画面に転送する
+        引数 screen：画面Surface
+        戻り値：描画した範囲のRectのリスト
+        """
+        self.HP_image = self.HP_label.render(f"HP: {self.HP_life}/{self.HP_limit}")  # HPの反映を表示させる
+        self.damege_image = self.damege_label.render(f'Damage: {self.damege}')  # 攻撃力を反映させる
+        return [
+            screen.blit(self.image, self.rect),
+            screen.blit(self.HP_image, self.HP_rect),
+            screen.blit(self.damege_image, self.damege_rect),
+        ]
+
+class Enemy_Beam(pg.sprite.Sprite):
+    """
+    敵のビーム（レーザー風）に関するクラス
+    Surfaceは持たず，始点・終点・太さ・色だけを覚えておき，描画時に画面へ直接線を引く
+    """
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255), (0, 255, 255)]
+    bold_max = 9  # 描画するビームの最大の太さ
+    bold_hit = 10  # boldがこの値以上になるとこうかとんに当たる
+    life = 11  # boldがこの値になったらビームを消す
+
+    def __init__(self, emy: "Enemy", bird:Bird, rng: random.Random = random):
+        """
+        敵機からこうかとんへ向かうビームを生成する
+        引数1 emy:ビームを射出する敵機
+        引数2 bird:攻撃対象のこうかとん
+        引数3 rng：乱数生成器（ゲームごとのrandom.Random）
+        """
+        super().__init__()
+        self.start = emy.rect.center
+        self.end = bird.rect.center
+        self.color = rng.choice(__class__.colors)
+        self.bold = 1
+        # 線分を囲む最小の矩形（最大の太さの分だけ広げる）
+        x0, y0 = self.start
+        x1, y1 = self.end
+        self.rect = pg.Rect(min(x0, x1), min(y0, y1), abs(x1-x0)+1, abs(y1-y0)+1)
+        self.rect.inflate_ip(__class__.bold_max, __class__.bold_max)
+
+    def update(self, tmr: int):
+        """
+        10フレームごとにビームを太くし，寿命に達したら消す
+        引数 tmr：ゲームのフレームカウンタ
+        """
+        if tmr%10 == 0:
+            self.bold += 1
+        if self.bold >= __class__.life:
+            self.kill()
+
+    def hits(self, rct: pg.Rect, bold: int|None = None) -> bool:
+        """
+        ビームが当たり判定の太さに達していて，かつrctと重なっているかを判定する
+        まず外接矩形どうしで大まかに判定し，重なる場合だけ線分との厳密な判定を行う
+        引数1 rct：判定するRect（こうかとんRect）
+        引数2 bold：この太さだとしたときの判定をする（Noneなら今の太さ．自動操作の先読み用）
+        """
+        bold = self.bold if bold is None else bold
+        if bold < __class__.bold_hit or not self.rect.colliderect(rct):
+            return False
+        return collide_segment_rect(self.start, self.end, min(bold, __class__.bold_max), rct)
+
+    def draw(self, screen: pg.Surface) -> pg.Rect:
+        """
+        ビームの線分を画面に直接描画する
+        引数 screen：画面Surface
+        戻り値：描画した範囲のRect
+        """
+        return pg.draw.line(screen, self.color, self.start, self.end, min(self.bold, __class__.bold_max))
+
+
+class Enemy_Beams(pg.sprite.RenderUpdates):
+    """
+    Enemy_Beamをまとめるグループ
+    ビームはimageを持たないので，draw()では各ビームに画面へ直接描画させる
+    """
+    def draw(self, screen: pg.Surface) -> list[pg.Rect]:
+        """
+        各ビームを描画し，RenderUpdatesと同じく前回と今回の描画範囲（更新が必要な範囲）を返す
+        引数 screen：画面Surface
+        """
+        dirty = self.lostsprites
+        self.lostsprites = []
+        for beam in self.sprites():
+            old, new = self.spritedict[beam], beam.draw(screen)
+            dirty.append(new.union(old) if old else new)
+            self.spritedict[beam] = new
+        return dirty
+
+
+class Bomb(Pooled):
+    """
+    爆弾に関するクラス
+    """
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255), (0, 255, 255)]
+    radii = range(10, 51)  # 爆弾円の半径：10以上50以下
+    atlas = {}  # (半径, 色) → 爆弾円Surface（アトラスの部分Surface）
+
+    @classmethod
+    def prepare(cls):
+        """
+        すべての半径と色の爆弾円を1枚のSurface（アトラス）に先に描いておき，
+        (半径, 色)から部分Surfaceをすぐに引ける表を作る
+        行が色，列が半径の並びで，各部分SurfaceはRLE圧縮したカラーキー付きにする
+        """
+        sheet = pg.Surface((sum(2*rad for rad in cls.radii), 2*max(cls.radii)*len(cls.colors)))
+        if pg.display.get_surface() is not None:  # 画面があれば画面のピクセル形式に変換する
+            sheet = sheet.convert()
+        sheet.fill((0, 0, 0))
+        cls.atlas = {}
+        for row, color in enumerate(cls.colors):
+            x, y = 0, 2*max(cls.radii)*row
+            for rad in cls.radii:
+                pg.draw.circle(sheet, color, (x+rad, y+rad), rad)
+                img = sheet.subsurface((x, y, 2*rad, 2*rad))
+                img.set_colorkey((0, 0, 0), pg.RLEACCEL)
+                cls.atlas[rad, color] = img
+                x += 2*rad
+
+    def __init__(self, emy: "Enemy", bird: Bird, rng: random.Random = random):
+        """
+        爆弾円Surfaceを生成する
+        引数1 emy：爆弾を投下する敵機
+        引数2 bird：攻撃対象のこうかとん
+        引数3 rng：乱数生成器（ゲームごとのrandom.Random）
+        """
+        super().__init__()
+        self.reset(emy, bird, rng)
+
+    def reset(self, emy: "Enemy", bird: Bird, rng: random.Random = random):
+        """
+        爆弾の状態を初期化する（プールから使い回すときにも呼ばれる）
+        爆弾円はアトラスの部分Surfaceを共有するので，Surfaceは新しく作らない
+        引数1 emy：爆弾を投下する敵機
+        引数2 bird：攻撃対象のこうかとん
+        引数3 rng：乱数生成器（ゲームごとのrandom.Random）
+        """
+        if not __class__.atlas:
+            __class__.prepare()
+        rad = rng.randint(10, 50)  # 爆弾円の半径：10以上50以下の乱数
+        color = rng.choice(__class__.colors)  # 爆弾円の色：クラス変数からランダム選択
+        self.image = __class__.atlas[rad, color]
+        self.rect = self.image.get_rect()
+        # 爆弾を投下するemyから見た攻撃対象のbirdの方向を計算
+        self.vx, self.vy = calc_orientation(emy.rect, bird.rect)  
+        self.rect.centerx = emy.rect.centerx
+        self.rect.centery = emy.rect.centery+emy.rect.height/2
+        self.speed = 6
+
+    def update(self):
+        """
+        爆弾を速度ベクトルself.vx, self.vyに基づき移動させる
+        引数 screen：画面Surface
+        """
+        self.rect.move_ip(self.speed*self.vx, self.speed*self.vy)
+        if check_bound(self.rect) != (True, True):
+            self.kill()
+
+
+class Beam(Pooled):
+    """
+    ビームに関するクラス
+    """
+    table = {}  # こうかとんの向き → (ビーム画像, vx, vy)
+
+    @classmethod
+    def prepare(cls, steps: int = 8):
+        """
+        ビーム画像をsteps方向ぶん回転して先に作っておき，
+        こうかとんの8方向の向きから(画像, vx, vy)をすぐに引ける表を作る
+        引数 steps：先に作る回転画像の方向数（狙い撃ち用に8より細かくしてもよい）
+        """
+        assets.rotations("fig/beam.png", 2.0, steps=steps)
+        for dire in [(+1, 0), (+1, -1), (0, -1), (-1, -1), (-1, 0), (-1, +1), (0, +1), (+1, +1)]:
+            cls.table[dire] = cls.aim(math.degrees(math.atan2(-dire[1], dire[0])))
+
+    @staticmethod
+    def aim(angle: float) -> tuple[pg.Surface, float, float]:
+        """
+        角度angleに飛ぶビームの画像と速度ベクトルを返す
+        引数 angle：ビームの向き[度]（右が0度，反時計回り）
+        戻り値：(ビーム画像, vx, vy)
+        """
+        rad = math.radians(angle)
+        return assets.image("fig/beam.png", angle, 2.0), math.cos(rad), -math.sin(rad)
+
+    def __init__(self, bird: Bird, angle: float|None = None):
+        """
+        ビーム画像Surfaceを生成する
+        引数1 bird：ビームを放つこうかとん
+        引数2 angle：ビームの向き[度]（Noneならこうかとんの向き）
+        """
+        super().__init__()
+        self.reset(bird, angle)
+
+    def reset(self, bird: Bird, angle: float|None = None):
+        """
+        ビームの状態を初期化する（プールから使い回すときにも呼ばれる）
+        引数1 bird：ビームを放つこうかとん
+        引数2 angle：ビームの向き[度]（Noneならこうかとんの向き）
+        """
+        if angle is None and bird.dire in __class__.table:
+            self.image, self.vx, self.vy = __class__.table[bird.dire]
+        else:
+            if angle is None:
+                angle = math.degrees(math.atan2(-bird.dire[1], bird.dire[0]))
+            self.image, self.vx, self.vy = __class__.aim(angle)
+        self.rect = self.image.get_rect()
+        self.rect.centery = bird.rect.centery+bird.rect.height*self.vy
+        self.rect.centerx = bird.rect.centerx+bird.rect.width*self.vx
+        self.speed = 10
+        self.damege = 1
+
+    def update(self):
+        """
+        ビームを速度ベクトルself.vx, self.vyに基づき移動させる
+        引数 screen：画面Surface
+        """
+        self.rect.move_ip(self.speed*self.vx, self.speed*self.vy)
+        if check_bound(self.rect) != (True, True):
+            self.kill()
+
+
+class Explosion(Pooled):
+    """
+    爆発に関するクラス
+    """
+    def __init__(self, obj: "Bomb|Enemy", life: int):
+        """
+        爆弾が爆発するエフェクトを生成する
+        引数1 obj：爆発するBombまたは敵機インスタンス
+        引数2 life：爆発時間
+        """
+        super().__init__()
+        self.imgs = [assets.image("fig/explosion.gif"), assets.image("fig/explosion.gif", flip=(True, True))]
+        self.reset(obj, life)
+
+    def reset(self, obj: "Bomb|Enemy", life: int):
+        """
+        爆発の状態を初期化する（プールから使い回すときにも呼ばれる）
+        引数1 obj：爆発するBombまたは敵機インスタンス
+        引数2 life：爆発時間
+        """
+        self.image = self.imgs[0]
+        self.rect = self.image.get_rect(center=obj.rect.center)
+        self.life = life
+
+    def update(self):
+        """
+        爆発時間を1減算した爆発経過時間_lifeに応じて爆発画像を切り替えることで
+        爆発エフェクトを表現する
+        """
+        self.life -= 1
+        self.image = self.imgs[self.life//10%2]
+        if self.life < 0:
+            self.kill()
+
+
+class Enemy:
+    """
+    敵機に関するクラス（種類ごとの違いはArchetypeの値だけで表す）
+    画面上端から降下し，停止位置まで来たら止まって爆弾を投下する
+    たくさん出すので，pg.sprite.Spriteを継承せず（Spriteは1匹ごとに__dict__と所属グループのsetを持つ），
+    属性を__slots__だけに持つ．pygameのグループはSpriteでなくてもadd_internal()とremove_internal()を持つものを
+    入れられるので，描画と衝突判定はSpriteと同じに使える（ただし入れるグループは1つだけ）
+    """
+    __slots__ = ("group", "kind", "image", "rect", "vy", "bound", "state", "interval", "hp")
+
+    def __init__(self, kind: Archetype = ARCHETYPES["alien"], rng: random.Random = random,
+                 xy: tuple[int, int]|None = None):
+        """
+        引数1 kind：敵機の種類（ゲームモードの敵機の種類の表game.mode.archetypesの値）
+        引数2 rng：乱数生成器（ゲームごとのrandom.Random）
+        引数3 xy：出現位置と停止位置の(x座標, y座標)（分裂したとき．Noneなら画面上端のランダムな位置）
+        """
+        self.group = None  # 入っているグループ
+        self.kind = kind
+        x = rng.randint(0, WIDTH) if xy is None and kind.x_first else None
+        self.image = assets.image(rng.choice(kind.imgs))
+        self.rect = self.image.get_rect()
+        if xy is None:
+            self.rect.center = rng.randint(0, WIDTH) if x is None else x, 0
+            self.bound = rng.randint(50, HEIGHT/2)  # 停止位置
+        else:
+            self.rect.center = xy
+            self.bound = xy[1]
+        self.vy = kind.speed
+        self.state = "down"  # 降下状態or停止状態
+        self.interval = rng.randint(*kind.interval)  # 爆弾投下インターバル
+        self.hp = kind.hp
+
+    def add_internal(self, group: pg.sprite.AbstractGroup):
+        self.group = group
+
+    def remove_internal(self, group: pg.sprite.AbstractGroup):
+        self.group = None
+
+    def alive(self) -> bool:
+        return self.group is not None
+
+    def kill(self):
+        """
+        グループから外す（pg.sprite.Sprite.kill()と同じ）
+        """
+        if self.group is not None:
+            self.group.remove(self)
+
+    def take_damage(self, amount: int):
+        self.hp -= amount
+        if self.hp <= 0:
+            self.kill()
+
+    def split(self, archetypes: dict[str, Archetype], rng: random.Random = random) -> list["Enemy"]:
+        """
+        ビームが当たったときに分裂してできる敵機を返す（分裂しない種類なら空のリスト）
+        引数1 archetypes：敵機の種類の表（分裂してできる種類を名前で引く）
+        引数2 rng：乱数生成器（ゲームごとのrandom.Random）
+        """
+        x = self.rect.centerx  # 真下にしか動かないので出現時のx座標のまま
+        return [Enemy(archetypes[name], rng, (x+dx, self.bound)) for name, dx in self.kind.split]
+
+    def update(self):
+        """
+        敵機を速度ベクトルself.vyに基づき移動（降下）させる
+        停止位置boundまで降下したら，stateを停止状態に変更する（止まった後は何もしない）
+        """
+        if not self.vy:
+            return
+        rect = self.rect
+        if rect.centery > self.bound:
+            self.vy = 0
+            self.state = "stop"
+            return
+        rect.centery += self.vy
+
+
+class Enemies(pg.sprite.RenderUpdates):
+    """
+    Enemyをまとめるグループ
+    降下中の敵機だけを動かし，止まった敵機は次に爆弾を投下するtickの順に並べたヒープに入れておく
+    毎tick全敵機のtmr%intervalを調べる代わりに，ヒープの先頭からそのtickに投下する敵機だけを取り出す
+    """
+    def __init__(self, *sprites: pg.sprite.Sprite):
+        self.moving = {}  # 降下中の敵機（dictを順序付き集合として使う）
+        self.order = {}  # 敵機 → グループに加えた順番（同じtickに投下する敵機をグループの順に並べる）
+        self.added = 0  # これまでにグループに加えた数
+        self.schedule = []  # 止まった敵機の(次に投下するtick, 加えた順番, 敵機)のヒープ
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite: pg.sprite.Sprite, layer=None):
+        """
+        敵機をグループに加え，降下中として扱う（止まっていれば次のupdate()で投下の予定に入る）
+        """
+        super().add_internal(sprite, layer)
+        self.moving[sprite] = None
+        self.order[sprite] = self.added
+        self.added += 1
+
+    def remove_internal(self, sprite: pg.sprite.Sprite):
+        """
+        敵機をグループから外す（ヒープに残った予定は，取り出したときに捨てる）
+        """
+        super().remove_internal(sprite)
+        self.moving.pop(sprite, None)
+        del self.order[sprite]
+
+    def update(self, tmr: int):
+        """
+        降下中の敵機を動かし，止まった敵機は次にtmr%interval == 0になるtickに投下する予定を入れる
+        引数 tmr：今のtick（投下の判定はこのtickの次から）
+        """
+        stopped = []
+        for emy in self.moving:
+            emy.update()
+            if emy.state == "stop":
+                stopped.append(emy)
+        for emy in stopped:
+            del self.moving[emy]
+            tick = -(-(tmr+1)//emy.interval)*emy.interval
+            heapq.heappush(self.schedule, (tick, self.order[emy], emy))
+
+    def firing(self, tmr: int) -> list[Enemy]:
+        """
+        tmrに爆弾を投下する敵機をグループの順に取り出し，interval後の予定を入れ直す
+        引数 tmr：今のtick
+        戻り値：投下する敵機のリスト
+        """
+        schedule, order = self.schedule, self.order
+        fired = []
+        while schedule and schedule[0][0] <= tmr:
+            tick, seq, emy = heapq.heappop(schedule)
+            if order.get(emy) != seq:  # もう倒された（または入れ直された）敵機の予定
+                continue
+            fired.append(emy)
+            heapq.heappush(schedule, (tick+emy.interval, seq, emy))
+        return fired
+
+
+class Score:
+    """
+    打ち落とした爆弾，敵機の数をスコアとして表示するクラス
+    爆弾：1点
+    敵機：10点
+    """
+    def __init__(self):
+        self.font = pg.font.Font(None, 50)
+        self.color = (0, 0, 255)
+        self.value = 0
+        self.label = Label(self.font, self.color)
+        self.image = self.label.render(f"Score: {self.value}")
+        self.rect = self.image.get_rect()
+        self.rect.center = 100, HEIGHT-50
+
+    def update(self, screen: pg.Surface) -> pg.Rect:
+        self.image = self.label.render(f"Score: {self.value}")
+        return screen.blit(self.image, self.rect)
+
+class Enemysum:
+
+    def __init__(self):
+        self.font = pg.font.Font(None, 50)
+        self.color = (0, 255, 255)
+        self.value = 0
+        self.label = Label(self.font, self.color)
+        self.image = self.label.render(f"enemy: {self.value}")
+        self.rect = self.image.get_rect()
+        self.rect.center = 100, HEIGHT-100
+
+    def update(self, screen: pg.Surface) -> pg.Rect:
+        self.image = self.label.render(f"enemy: {self.value}")
+        return screen.blit(self.image, self.rect)
+
+class nextround:
+
+    def __init__(self):
+        self.font = pg.font.Font(None, 50)
+        self.color = (255, 0, 255)
+        self.value = 0
+        self.label = Label(self.font, self.color)
+        self.image = self.label.render(f"next for : {5-self.value%5} Enemys")
+        self.rect = self.image.get_rect()
+        self.rect.center = 175, HEIGHT-150
+
+    def update(self, screen: pg.Surface) -> pg.Rect:
+        self.image = self.label.render(f"next for : {5-self.value%5} Enemys")
+        return screen.blit(self.image, self.rect)
+
+
+class Gravity(pg.sprite.Sprite):
+    def __init__(self, life:int):
+
+        super().__init__()
+        self.image = pg.Surface((1600, 900))
+        self.rect = pg.draw.rect(self.image, 0, (0,0,WIDTH,HEIGHT))
+        self.image.set_alpha(200) 
+        self.life = life
+    
+    def update(self):
+
+        self.life -=1
+        if self.life< 0:
+            self.kill()
+
+
+class Shield(pg.sprite.Sprite):
+
+    """
+    防御壁に関するクラス
+    """
+    def __init__(self, bird: Bird, life: int):
+        """
+        防御壁を生成する
+        Args:
+            bird: こうかとんのインスタンス
+            life: 防御壁の発動時間
+        """
+        super().__init__()
+        width, height = bird.rect.height * 2,20
+        self.image = pg.Surface((width, height))  # 手順1
+        pg.draw.rect(self.image, (0, 0, 255), (0, 0, 20, bird.rect.height * 2))
+        color = (0, 0, 255)
+        self.life = life  # 防御壁の発動時間
+        vx, vy = 1,1  # 手順3
+        angle = math.degrees(math.atan2(-vy, vx))  # 手順4
+        self.image = pg.transform.rotozoom(self.image, angle,1.0)
+        self.rect = self.image.get_rect()
+        self.rect.centerx = bird.rect.centerx + vx * bird.rect.width  # 手順6
+        self.rect.centery = bird.rect.centery + vy * bird.rect.height
+
+    def update(self):
+        """
+        防御壁の発動時間を減算し、0未満になったら削除する
+        """
+        self.life -= 1
+        if self.life < 0:
+            self.kill()
+ 
+
+class Round:
+    def __init__(self): # ラウンド数表示
+        self.round = 1
+        self.font = pg.font.Font(None, 100)
+        self.label = Label(self.font, (255,255,255))
+        self.text = self.label.render(f"Round: {self.round}")
+        self.rect = self.text.get_rect()
+        self.rect.center = (800, 100)
+        self.kill = 0
+        self.flem = 200
+
+    def update(self, screen: pg.Surface) -> pg.Rect:
+        self.text = self.label.render(f"Round: {self.round}")
+        return screen.blit(self.text, self.rect)
+
+
+class Bouns(pg.sprite.Sprite):
+    def __init__(self, rng: random.Random = random):
+        """
+        引数 rng：乱数生成器（ゲームごとのrandom.Random）
+        """
+        super().__init__()
+        self.image = assets.image("fig/heart.png")
+        self.rect = self.image.get_rect()
+        self.rect.center = rng.randint(0, WIDTH), 0
+        self.vy = +6
+        self.bound = rng.randint(50, HEIGHT/2)  # 停止位置
+
+    def update(self):
+        if self.rect.centery > self.bound:
+            self.vy = 0
+        self.rect.centery += self.vy
+
+
+class Clear_Bou(pg.sprite.Sprite):
+    def __init__(self, rng: random.Random = random):
+        """
+        引数 rng：乱数生成器（ゲームごとのrandom.Random）
+        """
+        super().__init__()
+        self.image = assets.image("fig/beam.png")
+        self.rect = self.image.get_rect()
+        self.rect.center = rng.randint(0, WIDTH), 0
+        self.vy = +6
+        self.bound = rng.randint(50, HEIGHT/2)  # 停止位置
+
+    def update(self):
+        if self.rect.centery > self.bound:
+            self.vy = 0
+        self.rect.centery += self.vy
+
+
+class Game:
+    """
+    1ゲーム分の状態（こうかとん，各スプライトグループ，スコア，ラウンドなど）を保持し，
+    1フレームずつゲームを進めるクラス
+    ロジック（update）と描画（draw）を分けているので，画面なしでも同じ処理を回せる
+    乱数はゲームごとのself.rngだけを使うので，同じシードと操作なら同じゲームになる
+    """
+    keys = [pg.K_UP, pg.K_DOWN, pg.K_LEFT, pg.K_RIGHT, pg.K_LSHIFT]  # ロジックが読む押下キー（操作の記録の対象）
+
+    def __init__(self, brute_force: bool = False, vectorized: bool = False, seed: int|None = None,
+                 mode: Mode = MODES["legend"]):
+        """
+        引数1 brute_force：Trueなら衝突判定に空間ハッシュを使わず総当たりで判定する（比較用）
+        引数2 vectorized：Trueなら爆弾とビームをNumPyの配列でまとめて動かす（弾幕のように弾が多いとき用）
+        引数3 seed：このゲームの乱数シード（Noneならrandomモジュールから決める）
+        引数4 mode：ゲームモード（このゲーム用にコピーして使う）
+        """
+        self.mode = dataclasses.replace(mode)  # 難易度の調整用のパラメータ（batch.pyから変えて試せる）
+        self.mode.archetypes = {name: dataclasses.replace(kind) for name, kind in mode.archetypes.items()}
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.score = Score()
+        self.n = 0
+        self.bird = Bird(3, (900, 400), self.mode.hp)
+        self.e_beam = Enemy_Beams()
+        self.bombs = Projectiles((WIDTH, HEIGHT)) if vectorized else pg.sprite.RenderUpdates()
+        self.beams = Projectiles((WIDTH, HEIGHT)) if vectorized else pg.sprite.RenderUpdates()
+        self.exps = pg.sprite.RenderUpdates()
+        self.emys = Enemies()
+        self.gravity = pg.sprite.RenderUpdates()
+        self.shields = pg.sprite.RenderUpdates()
+        self.round = Round()
+        self.hearts = pg.sprite.RenderUpdates()
+        self.attack_up = pg.sprite.RenderUpdates()
+        self.enemysum = Enemysum()
+        self.nxt = nextround()
+        self.tmr = 0
+        self.prev = []  # 直前のロジック更新前の各スプライトの(Rect, 位置)（描画の補間用）
+        self.drawn = []  # 前のフレームで描画したこうかとんと文字表示の範囲
+        self.collider = Collider(brute_force)
+        # よく作っては消すスプライトは，消えたものをプールに取っておいて使い回す
+        self.beam_pool = Pool(Beam)
+        self.bomb_pool = Pool(Bomb)
+        self.exp_pool = Pool(Explosion)
+        Beam.prepare()  # ビームの8方向の画像を先に作っておく
+        Bomb.prepare()  # 爆弾円の全種類の画像を先に作っておく
+
+    def handle_event(self, event: pg.event.Event) -> bool:
+        """
+        キー入力などのイベントを処理する
+        引数 event：pg.event.get()で得たイベント
+        戻り値：ウィンドウが閉じられたらFalse，それ以外はTrue
+        """
+        bird, score = self.bird, self.score
+        if event.type == pg.QUIT:
+            return False
+        if event.type == pg.KEYDOWN and event.key == pg.K_SPACE:
+            self.beams.add(self.beam_pool.get(bird))
+        if event.type == pg.KEYDOWN and event.key == pg.K_g and score.value >= 200:  # キー「ｇ」が押される　かつ、　スコアが２００以上なら
+            score.value -= 200
+            self.gravity.add(Gravity(400))
+        if event.type == pg.KEYDOWN and event.key == pg.K_k and score.value >= 100:  # 無敵状態の発動
+            bird.hyper_life = 500
+            score.value -= 100
+        if event.type == pg.KEYDOWN and event.key == pg.K_RSHIFT and score.value >= 50 and not self.shields: # シールド発動条件
+            score.value -= 50 # スコア50消費
+            self.shields.add(Shield(bird, 400)) # 400フレーム
+        return True
+
+    def spawn(self):
+        """
+        タイマーに応じて敵機，回復アイテム，攻撃力アップを出現させ，停止中の敵機に攻撃させる
+        """
+        tmr, round, mode = self.tmr, self.round, self.mode
+        if tmr%mode.spawn_interval == 0:  # spawn_intervalフレームに1回，敵機を出現させる
+            if round.round==1:
+                self.emys.add(Enemy(mode.archetypes["alien"], self.rng))
+            else:
+                self.emys.add(Enemy(mode.archetypes["big_slime"], self.rng))
+            self.n+=1
+            self.enemysum.value +=1
+        if mode.attack_up_interval and tmr%mode.attack_up_interval == 0:  # 攻撃力アップ
+            self.attack_up.add(Clear_Bou(self.rng))
+        if tmr%mode.heart_interval == 0:  # heart_intervalフレームに1回, HP回復できる
+            self.hearts.add(Bouns(self.rng))
+        for emy in self.emys.firing(tmr):  # 停止中の敵機のうち，このtickに投下するもの（tmr%interval == 0）
+            self.bombs.add(self.bomb_pool.get(emy, self.bird, self.rng))
+            if round.round >= mode.laser_round:
+                self.e_beam.add(Enemy_Beam(emy, self.bird, self.rng))
+
+    def collide(self) -> bool:
+        """
+        衝突判定の段階：衝突の組をグループの組み合わせごとに1回だけ求め，
+        組ごとの処理（ダメージ，分裂，得点，爆発エフェクト）に振り分ける
+        戻り値：こうかとんが生きていればTrue，HPが0になったらFalse
+        """
+        bird = self.bird
+        collider = self.collider
+        collider.begin()  # 空間ハッシュはこのフレームの位置で作り直す
+        pierce = bird.damege > 3  # 攻撃力が3より大きいとビームが爆弾を貫通する
+        rules = [  # (判定するグループ, 判定されるグループ, 前者を消すか, 後者を消すか, 衝突したときの処理)
+            (self.emys, self.beams, False, True, self.hit_enemy),
+            (self.bombs, self.beams, True, not pierce, self.shoot_bomb),
+            (self.bombs, self.gravity, True, False, self.crush_bomb),
+            (self.emys, self.gravity, True, False, self.crush_enemy),
+        ]
+        for group1, group2, dokill1, dokill2, handler in rules:
+            for spr in collider.groupcollide(group1, group2, dokill1, dokill2):
+                handler(spr)
+
+        if len(collider.spritecollide(bird, self.hearts, True)) != 0:  # 空からのハートを拾うと回復できる
+            if bird.HP_life < bird.HP_limit:
+                bird.HP_life += 1
+        if len(collider.spritecollide(bird, self.attack_up, True)) != 0:  # ビームを拾うと攻撃アップ
+            bird.damege += self.mode.damege_up
+        if len(collider.spritecollide(bird, self.bombs, True)) != 0:  # こうかとんと爆弾の衝突判定
+            if bird.state == "normal":
+                bird.HP_life -= 1  # こうかとんが攻撃を耐えることができた
+                if bird.HP_life <= 0:
+                    return False
+            else:
+                self.score.value += 1
+
+        for beam in self.e_beam:  # こうかとんと敵のビームの衝突判定
+            if beam.hits(bird.rect):
+                beam.kill()
+                if bird.state == "normal":
+                    bird.HP_life -= 1
+                    if bird.HP_life <= 0:
+                        return False
+
+        # 防御壁が存在し、爆弾が防御壁に衝突した場合は爆弾を削除する
+        for bomb in collider.groupcollide(self.bombs, self.shields, True, False):
+            self.exps.add(self.exp_pool.get(bomb, 50))  # 爆発エフェクト
+        return True
+
+    def hit_enemy(self, emy: Enemy):
+        """
+        ビームが当たった敵機にダメージを与える（大きいスライムのように分裂する種類は当たるたびに分裂する）
+        引数 emy：ビームが当たった敵機
+        """
+        if emy.kind.split:
+            self.split(emy)
+        emy.take_damage(self.bird.damege)
+        self.exps.add(self.exp_pool.get(emy, 10))
+        if emy.hp <= 0:
+            self.exps.add(self.exp_pool.get(emy, 100))  # 爆発エフェクト
+            self.score.value += 10  # 10点アップ
+            self.bird.change_img(6)  # こうかとん喜びエフェクト
+            self.round.kill+=1
+            self.enemysum.value -= 1
+            self.nxt.value+=1
+
+    def split(self, sraim: Enemy):
+        """
+        大きいスライムを小さいスライム2匹に（種類ごとの分裂のしかたで）分裂させる
+        引数 sraim：ビームが当たった大きいスライム
+        """
+        children = sraim.split(self.mode.archetypes, self.rng)
+        self.emys.add(*children)
+        self.exps.add(self.exp_pool.get(sraim, 10))  # 爆発エフェクト
+        self.score.value += 10  # 10点アップ
+        self.round.kill += 1
+        self.enemysum.value += len(children)
+        self.nxt.value+=1
+        self.bird.change_img(6)  # こうかとん喜びエフェクト
+
+    def shoot_bomb(self, bomb: "Bomb"):
+        """
+        ビームで撃ち落とした爆弾を爆発させる
+        引数 bomb：ビームが当たった爆弾
+        """
+        self.exps.add(self.exp_pool.get(bomb, 30 if self.bird.damege > 3 else 50))  # 爆発エフェクト
+        self.score.value += 1  # 1点アップ
+
+    def crush_bomb(self, bomb: "Bomb"):
+        """
+        重力場で爆弾を潰す
+        引数 bomb：重力場に入った爆弾
+        """
+        self.exps.add(self.exp_pool.get(bomb, 50))  # 爆発エフェクト
+        self.score.value += 1
+
+    def crush_enemy(self, emy: Enemy):
+        """
+        重力場で敵機を倒す
+        引数 emy：重力場に入った敵機
+        """
+        self.exps.add(self.exp_pool.get(emy, 50))  # 爆発エフェクト
+        self.score.value += 10
+        self.round.kill += 1
+        self.nxt.value+=1
+        self.enemysum.value -= 1
+        self.nxt.value+=1
+
+    def next_round(self):
+        """
+        キル数が規定に達したらラウンドを進め，（モードによっては）強化アイテムを出現させる
+        """
+        round = self.round
+        if round.kill >= 5: # 5回キルをするとラウンド数が増える
+            round.kill += 1
+            round.round += 1
+            round.kill = 0
+            if self.mode.round_bonus:
+                self.attack_up.add(Clear_Bou(self.rng))  # ランドごとに攻撃力アップできる
+                self.hearts.add(Bouns(self.rng))
+            if round.flem <= 50:
+                round.flem -= 0.1
+            else:
+                 round.flem -= 50
+
+    def update(self, key_lst: list[bool]) -> bool:
+        """
+        1フレーム分のゲームロジック（出現，衝突判定，ラウンド更新，移動）を進める
+        引数 key_lst：押下キーの真理値リスト
+        戻り値：ゲーム続行ならTrue，こうかとんのHPが0になったらFalse
+        """
+        self.spawn()
+        if not self.collide():
+            return False
+        self.next_round()
+        self.bird.update(key_lst)
+        self.beams.update()
+        self.emys.update(self.tmr)
+        self.hearts.update()
+        self.attack_up.update()
+        self.bombs.update()
+        self.exps.update()
+        self.shields.update()
+        self.gravity.update()
+        self.e_beam.update(self.tmr)
+        self.bird.update(key_lst)
+        self.tmr += 1
+        return True
+
+    def play(self, replay: Replay) -> bool:
+        """
+        記録した操作で1tick分ゲームを進める（イベントを処理してからupdateする）
+        最後のtickの後には，記録を終える前に処理されたイベントも処理する
+        引数 replay：操作の記録
+        戻り値：ゲーム続行ならTrue，記録が終わったか，こうかとんのHPが0になったらFalse
+        """
+        if self.tmr >= len(replay):
+            return False
+        key_lst, keys = replay[self.tmr]
+        for key in keys:
+            self.handle_event(pg.event.Event(pg.KEYDOWN, key=key))
+        alive = self.update(key_lst)
+        if self.tmr == len(replay):
+            for key in replay.tail:
+                self.handle_event(pg.event.Event(pg.KEYDOWN, key=key))
+        return alive
+
+    def digest(self) -> int:
+        """
+        ゲームの状態（時刻，スコア，こうかとん，全スプライトの位置，乱数の状態）のCRC32を返す
+        記録したゲームと再生したゲームが同じになったかの照合に使う
+        """
+        bird = self.bird
+        state = [self.tmr, self.score.value, self.round.round, bird.HP_life, bird.HP_limit, bird.damege,
+                 tuple(bird.rect), self.rng.getstate()]
+        for group in (self.beams, self.emys, self.hearts, self.attack_up, self.bombs,
+                      self.exps, self.shields, self.gravity, self.e_beam):
+            state.append([tuple(spr.rect) for spr in group])
+        return zlib.crc32(repr(state).encode())
+
+    def snapshot(self):
+        """
+        動くスプライトの現在位置を覚えておく（次のupdateの前に呼ぶと，drawで前後の位置を補間できる）
+        """
+        self.prev = [(spr, spr.rect, spr.rect.topleft) for group in (self.beams, self.emys, self.hearts, self.attack_up, self.bombs)
+                     for spr in group]
+        self.prev.append((self.bird, self.bird.rect, self.bird.rect.topleft))
+
+    def interpolate(self, alpha: float) -> list[tuple[pg.Rect, tuple[int, int]]]:
+        """
+        snapshotで覚えた位置と現在位置の間のalphaの位置に，各スプライトのRectを一時的に動かす
+        引数 alpha：補間の割合（0なら前の位置，1なら現在位置）
+        戻り値：元に戻すための(Rect, 現在位置)のリスト
+        """
+        moved = []
+        for spr, rect, (x0, y0) in self.prev:
+            if spr.rect is not rect:  # プールから使い回されて別の弾になったもの
+                continue
+            x1, y1 = rect.topleft
+            if (x0, y0) != (x1, y1):
+                moved.append((rect, (x1, y1)))
+                rect.topleft = round(x0+(x1-x0)*alpha), round(y0+(y1-y0)*alpha)
+        return moved
+
+    def clear(self, screen: pg.Surface, bg_img: pg.Surface):
+        """
+        前のフレームで描画した範囲だけを背景画像で塗り直す
+        引数1 screen：画面Surface
+        引数2 bg_img：背景画像Surface
+        """
+        for group in (self.beams, self.emys, self.hearts, self.attack_up, self.bombs,
+                      self.exps, self.shields, self.gravity, self.e_beam):
+            group.clear(screen, bg_img)
+        for rect in self.drawn:
+            screen.blit(bg_img, rect, rect)
+
+    def draw(self, screen: pg.Surface, alpha: float = 1.0) -> list[pg.Rect]:
+        """
+        全スプライトとスコア等の表示を画面に転送する
+        引数1 screen：画面Surface
+        引数2 alpha：直前のロジック更新の前後の位置を補間する割合（1なら現在位置にそのまま描く）
+        戻り値：前のフレームから変化した（pg.display.updateが必要な）範囲のRectのリスト
+        """
+        moved = self.interpolate(alpha) if alpha < 1.0 and self.prev else []
+        dirty = []
+        dirty += self.beams.draw(screen)
+        dirty += self.emys.draw(screen)
+        dirty += self.hearts.draw(screen)  # ハートのブリット
+        dirty += self.attack_up.draw(screen)
+        dirty += self.bombs.draw(screen)
+        dirty += self.exps.draw(screen)
+        dirty += self.shields.draw(screen)  # 防御壁の描画を追加
+        drawn = [self.score.update(screen), self.enemysum.update(screen), self.nxt.update(screen)]
+        dirty += self.gravity.draw(screen)
+        dirty += self.e_beam.draw(screen)
+        drawn += self.bird.draw(screen)
+        drawn.append(self.round.update(screen))
+        dirty += self.drawn+drawn  # 前回の位置を消した範囲と今回描いた範囲
+        self.drawn = drawn
+        for rect, xy in moved:  # 補間で動かしたRectを現在位置に戻す
+            rect.topleft = xy
+        return dirty
+
+
+def main(mode: Mode, headless: bool = False, frames: int = 0, brute_force: bool = False, vectorized: bool = False,
+         fps: int = 60, seed: int|None = None, record: str|None = None, replay: str|None = None,
+         bot: str = "keyboard", telemetry: str|None = None, profile: str|None = None, profile_top: int = 25):
+    """
+    ゲームのメインループ
+    引数1 mode：ゲームモード
+    引数2 headless：Trueなら描画，画面更新，フレームレート制御を行わず，ロジックだけを全速で回す
+    引数3 frames：ヘッドレス時に回す最大フレーム数（0なら，こうかとんのHPが0になるまで）
+    引数4 brute_force：Trueなら衝突判定を総当たりで行う（空間ハッシュとの比較用）
+    引数5 vectorized：Trueなら爆弾とビームをNumPyの配列でまとめて動かす
+    引数6 fps：1秒あたりの描画回数の上限（0なら制限しない）
+    引数7 seed：ゲームの乱数シード（Noneならランダム）
+    引数8 record：操作を記録するファイルのパス（Noneなら記録しない）
+    引数9 replay：再生する記録ファイルのパス（キーボードの代わりに記録の操作でゲームを進める）
+    引数10 bot：こうかとんを操作するコントローラの名前（controller.CONTROLLERS．"keyboard"ならキーボード）
+    引数11 telemetry：フレームごとの計測値を書き出すファイルのパス（Noneなら記録しない．画面ありのときだけ）
+    引数12 profile：メインループのプロファイルをラウンドなどの状況ごとに書き出すディレクトリ（Noneならプロファイルしない）
+    引数13 profile_top：状況ごとのテキストに書き出す関数の数
+    """
+    pg.display.set_caption(mode.caption)
+    screen = pg.display.set_mode((WIDTH, HEIGHT))
+    assets.preload("fig")  # ゲーム中に画像をディスクから読み込まないようにする
+    bg_img = assets.image("fig/pg_bg.jpg")
+    replayer = Replay(replay, Game.keys) if replay else None
+    if replayer is not None and replayer.mode not in (None, mode.name):
+        raise ValueError(f"{replay}は{replayer.mode}モードの記録なので，{mode.name}モードでは再生できません")
+    game = Game(brute_force, vectorized, replayer.seed if replayer else seed, mode)
+    recorder = Recorder(record, game.seed, mode.name, Game.keys) if record else None
+    controller = Bot((WIDTH, HEIGHT)) if bot == "bot" else CONTROLLERS[bot]()
+    overlay = PerfOverlay(game, 1000/(fps or TICK_RATE))
+    sink = Telemetry(telemetry, 1000/TICK_RATE) if telemetry and not headless else None  # ロジック1回分（20ms）が上限
+    profiler = SegmentProfiler(profile, profile_top) if profile else None
+
+    def poll() -> bool:
+        """
+        イベントを処理する（再生中はウィンドウを閉じる操作と性能表示の切り替えだけを受け付ける）
+        戻り値：ウィンドウが閉じられたらFalse，それ以外はTrue
+        """
+        for event in pg.event.get():
+            if event.type == pg.KEYDOWN and event.key == PerfOverlay.key:  # ゲームの操作ではないので記録しない
+                overlay.toggle()
+            elif replayer is not None:
+                if event.type == pg.QUIT:
+                    return False
+            elif not game.handle_event(event):
+                return False
+            elif recorder is not None:
+                recorder.event(event)
+        return True
+
+    def tick() -> bool:
+        """
+        1tick分ゲームを進める（プロファイル中は，その間だけ今の状況のプロファイラで計測する）
+        戻り値：ゲーム続行ならTrue，それ以外はFalse
+        """
+        if profiler is None:
+            return advance()
+        profiler.start(game, "logic")
+        try:
+            return advance()
+        finally:
+            profiler.stop()
+
+    def advance() -> bool:
+        """
+        1tick分ゲームを進める（再生中は記録の操作，それ以外はコントローラの操作で）
+        戻り値：ゲーム続行ならTrue，それ以外はFalse
+        """
+        if replayer is not None:
+            return game.play(replayer)
+        key_lst, events = controller.control(game)
+        for event in events:  # 自動操作のキー入力もキーボードと同じく処理し，記録する
+            game.handle_event(event)
+            if recorder is not None:
+                recorder.event(event)
+        if recorder is not None:
+            recorder.tick(key_lst)
+        return game.update(key_lst)
+
+    try:
+        if headless:
+            start = time.perf_counter()
+            while frames <= 0 or game.tmr < frames:
+                if not poll() or not tick():
+                    break
+            elapsed = time.perf_counter() - start
+            fps = game.tmr/elapsed if elapsed > 0 else 0.0
+            print(f"headless: {game.tmr} frames in {elapsed:.2f} s ({fps:.0f} fps)")
+            return fps
+        return run_window(game, screen, bg_img, fps, poll, tick, overlay, sink, profiler)
+    finally:
+        if profiler is not None:
+            profiler.dump()
+        if sink is not None:
+            sink.close()
+        if recorder is not None:
+            recorder.close(game.tmr, game.digest())
+            print(f"record: {game.tmr} ticks (seed {game.seed}) -> {record}")
+        if replayer is not None and replayer.end is not None:
+            ticks, digest = replayer.end
+            if game.tmr != ticks:
+                print(f"replay: stopped at tick {game.tmr} of {ticks}")
+            elif game.digest() == digest:
+                print(f"replay: reproduced {ticks} ticks exactly")
+            else:
+                print(f"replay: diverged from the recording (digest {game.digest():08x} != {digest:08x})")
+
+
+def run_window(game: Game, screen: pg.Surface, bg_img: pg.Surface, fps: int, poll, tick,
+               overlay: PerfOverlay|None = None, telemetry: Telemetry|None = None,
+               profiler: SegmentProfiler|None = None):
+    """
+    画面を表示してゲームを進めるループ
+    ロジックは描画の速さに関係なく1秒にTICK_RATE回ずつ進め（固定タイムステップ），
+    描画は毎回，直前のロジック更新の前後の位置を補間して行う
+    引数1 game：ゲーム
+    引数2 screen：画面Surface
+    引数3 bg_img：背景画像Surface
+    引数4 fps：1秒あたりの描画回数の上限（0なら制限しない）
+    引数5 poll：イベントを処理し，ウィンドウが閉じられたらFalseを返す関数
+    引数6 tick：1tick分ゲームを進め，ゲームが終わったらFalseを返す関数
+    引数7 overlay：性能表示（Noneなら表示しない）
+    引数8 telemetry：フレームごとの計測値の記録（Noneなら記録しない）
+    引数9 profiler：状況ごとのプロファイラ（描画の間だけ計測する．Noneなら計測しない）
+    """
+    overlay = overlay or PerfOverlay(game, 1000/(fps or TICK_RATE))
+    clock = pg.time.Clock()
+    full = True  # 次のフレームで画面全体を描き直すか
+
+    step = 1/TICK_RATE  # ロジック1回分の時間[s]
+    lag = 0.0  # まだロジックを進めていない経過時間[s]
+    last = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        lag = min(lag+now-last, MAX_TICKS*step)  # 処理が大きく遅れたときは追いつくのをあきらめる
+        last = now
+        if not poll():
+            return 0
+        ticks = 0  # このフレームで進めたロジックの更新回数
+        while lag >= step:
+            game.snapshot()
+            if not tick():
+                game.bird.change_img(8, screen) # こうかとん悲しみエフェクト
+                game.score.update(screen)
+                pg.display.update()
+                time.sleep(2)
+                return
+            lag -= step
+            ticks += 1
+        drawing = time.perf_counter()
+        if profiler is not None:
+            profiler.start(game, "draw")
+        alpha = lag/step  # 次のロジック更新までの進み具合
+        if full or game.gravity:  # 重力場など全画面の効果がある間は画面全体を描き直す
+            screen.blit(bg_img, [0, 0])
+            game.draw(screen, alpha)
+            overlay.draw(screen)
+            pg.display.update()
+            full = bool(game.gravity)  # 効果が消えた次のフレームも全体を描き直す
+        else:  # 前回の描画範囲を背景で消し，変化した範囲だけを画面に反映する
+            game.clear(screen, bg_img)
+            overlay.clear(screen, bg_img)
+            pg.display.update(game.draw(screen, alpha)+overlay.draw(screen))
+        if profiler is not None:
+            profiler.stop()  # 描画回数を抑えるための待ち（clock.tick）は計測しない
+        drawn = time.perf_counter()
+        clock.tick(fps)
+        overlay.frame(clock)
+        if telemetry is not None:
+            telemetry.record(game, clock, drawing-now, drawn-drawing, ticks)
+
+        
+def launch(mode: Mode):
+    """
+    コマンドライン引数を読み，modeのゲームを起動する（kokaton_legend.py，musou_kokaton.pyから呼ぶ）
+    引数 mode：ゲームモード
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="画面なしでロジックだけを全速で回し，FPSを表示する")
+    parser.add_argument("--frames", type=int, default=0, help="ヘッドレス時の最大フレーム数（0なら無制限）")
+    parser.add_argument("--brute-force", action="store_true", help="衝突判定を空間ハッシュではなく総当たりで行う")
+    parser.add_argument("--numpy", action="store_true", help="爆弾とビームをNumPyの配列でまとめて動かす")
+    parser.add_argument("--fps", type=int, default=60, help="1秒あたりの描画回数の上限（0なら制限しない，ロジックは常に毎秒50回）")
+    parser.add_argument("--seed", type=int, help="ゲームの乱数シード（省略するとランダム）")
+    parser.add_argument("--record", metavar="PATH", help="操作を記録するファイル")
+    parser.add_argument("--replay", metavar="PATH", help="記録ファイルの操作でゲームを再生する")
+    parser.add_argument("--telemetry", metavar="PATH", help="フレームごとの計測値をまとめて書き出すファイル（.csvならCSV，それ以外はJSON Lines）")
+    parser.add_argument("--profile", metavar="DIR", help="メインループをcProfileで計測し，ラウンドなどの状況ごとの結果をDIRに書き出す")
+    parser.add_argument("--profile-top", type=int, default=25, help="状況ごとのテキストに書き出す関数の数")
+    parser.add_argument("--bot", choices=CONTROLLERS, default="keyboard", help="こうかとんを操作するコントローラ（botは自動で避けて撃つ）")
+    args = parser.parse_args()
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"  # pg.init()より前に設定する
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pg.init()
+    main(mode, args.headless, args.frames, args.brute_force, args.numpy, args.fps, args.seed, args.record, args.replay, args.bot, args.telemetry,
+         args.profile, args.profile_top)
+    pg.quit()
+    sys.exit()
@@ -0,0 +1,105 @@
+"""
+記録したゲームの早送り再生
+記録ファイル（--recordで作ったもの）の操作で，画面なし・フレームレート制御なしでゲームを全速で進め直す
+指定したtickまで描画せずに進め（シーク），そこからNフレームに1回だけ画面を画像ファイルに書き出せる
+最後に1秒あたりのtick数と，時間のかかったtickを表示する
+
+使い方：python fastforward.py play.krp --seek 12000 --render-every 10 --out frames
+"""
+import argparse
+import heapq
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # pg.init()より前に設定する
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame as pg
+
+import assets
+from benchmark import GAMES, ORIGIN
+import engine
+from replay import Replay
+
+
+def render(game, screen: pg.Surface, bg_img: pg.Surface, out: str, ext: str):
+    """
+    ゲームの現在の画面を描き，out/frame_{tick}.{ext}に書き出す
+    """
+    screen.blit(bg_img, [0, 0])
+    game.draw(screen)
+    pg.image.save(screen, os.path.join(out, f"frame_{game.tmr:07d}.{ext}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="記録したゲームを画面なしで全速で再生する")
+    parser.add_argument("replay", help="記録ファイル")
+    parser.add_argument("--game", choices=GAMES, help="記録したゲーム（記録ファイルにゲームモードが書かれていれば省略できる）")
+    parser.add_argument("--seek", type=int, default=0, help="このtickまでは描画せずに進める")
+    parser.add_argument("--until", type=int, default=0, help="このtickで止める（0なら記録の最後まで）")
+    parser.add_argument("--render-every", type=int, default=0, help="シーク後，このtick数ごとに画面を書き出す（0なら書き出さない）")
+    parser.add_argument("--out", default="frames", help="画面を書き出すディレクトリ")
+    parser.add_argument("--format", choices=["bmp", "png", "jpg", "tga"], default="bmp",
+                        help="書き出す画像の形式（pngは圧縮に時間がかかる）")
+    parser.add_argument("--slowest", type=int, default=5, help="時間のかかったtickをいくつ表示するか")
+    parser.add_argument("--brute-force", action="store_true", help="衝突判定を空間ハッシュではなく総当たりで行う")
+    parser.add_argument("--numpy", action="store_true", help="爆弾とビームをNumPyの配列でまとめて動かす")
+    args = parser.parse_args()
+    path = os.path.join(ORIGIN, args.replay)
+    out = os.path.join(ORIGIN, args.out)
+
+    pg.init()
+    screen = pg.display.set_mode((1600, 900))
+    assets.preload("fig")
+    bg_img = assets.image("fig/pg_bg.jpg")
+    replay = Replay(path, engine.Game.keys)
+    if replay.mode is None and args.game is None:
+        parser.error(f"{args.replay}にはゲームモードが書かれていないので，--gameで指定してください")
+    if replay.mode is not None and replay.mode not in engine.MODES:
+        parser.error(f"{args.replay}のゲームモード{replay.mode}はありません")
+    if replay.mode is not None and args.game not in (None, replay.mode):
+        parser.error(f"{args.replay}は{replay.mode}モードの記録です（--game {args.game}）")
+    game = engine.Game(args.brute_force, args.numpy, replay.seed, engine.MODES[replay.mode or args.game])
+    until = min(args.until or len(replay), len(replay))
+    if args.render_every > 0:
+        os.makedirs(out, exist_ok=True)
+
+    slowest = []  # (所要時間[s], tick)の最小ヒープ（時間のかかった上位だけを残す）
+    frames = 0
+    rendering = 0.0  # 画面の書き出しにかかった時間[s]
+    alive = True
+    start = time.perf_counter()
+    while alive and game.tmr < until:
+        tick = game.tmr
+        t0 = time.perf_counter()
+        alive = game.play(replay)
+        sec = time.perf_counter()-t0
+        if len(slowest) < args.slowest:
+            heapq.heappush(slowest, (sec, tick))
+        elif slowest and sec > slowest[0][0]:
+            heapq.heapreplace(slowest, (sec, tick))
+        if game.tmr == args.seek:
+            seeked = time.perf_counter()-start
+            print(f"seek: reached tick {game.tmr} in {seeked:.2f} s ({game.tmr/seeked if seeked > 0 else 0:.0f} ticks/s)")
+        if args.render_every > 0 and game.tmr >= args.seek and (game.tmr-args.seek)%args.render_every == 0:
+            t0 = time.perf_counter()
+            render(game, screen, bg_img, out, args.format)
+            rendering += time.perf_counter()-t0
+            frames += 1
+    elapsed = time.perf_counter()-start
+
+    print(f"fastforward: {game.tmr} ticks in {elapsed:.2f} s ({game.tmr/elapsed if elapsed > 0 else 0:.0f} ticks/s), "
+          f"round {game.round.round}, score {game.score.value}")
+    if frames:
+        simulated = elapsed-rendering
+        print(f"rendered {frames} frames to {out} in {rendering:.2f} s "
+              f"(simulation alone: {game.tmr/simulated if simulated > 0 else 0:.0f} ticks/s)")
+    for sec, tick in sorted(slowest, reverse=True):
+        print(f"  tick {tick:>8}: {sec*1000:.2f} ms")
+    if replay.end is not None and game.tmr == replay.end[0]:
+        print("replay: reproduced the recording exactly" if game.digest() == replay.end[1] else
+              "replay: diverged from the recording")
+    pg.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+ゲームの処理時間の計測（benchmark.pyと性能表示overlay.pyで共通）
+計測するスプライトグループと文字表示の一覧，メソッドを所要時間を数える関数に差し替える仕組みをまとめる
+差し替えはインスタンス属性で行うので，インスタンス属性を消せばクラスのメソッドに戻る（計測のコストもなくなる）
+"""
+import time
+
+
+GROUPS = ["beams", "emys", "hearts", "attack_up", "bombs", "exps", "shields", "gravity", "e_beam"]  # Gameのスプライトグループ
+HUDS = ["score", "enemysum", "nxt", "round"]  # Gameの文字表示
+
+
+class MethodTimer:
+    """
+    オブジェクトのメソッドを計測付きの関数に差し替え，区間ごとの所要時間を合計するクラス
+    """
+    def __init__(self):
+        self.totals = {}  # 区間ごとの累積時間[s]（使う側で読んで0に戻す）
+        self.wrapped = []  # 差し替えた(オブジェクト, メソッド名)
+
+    def wrap(self, obj, attr: str, key: str):
+        """
+        obj.attrを，区間keyに所要時間を加算する関数に差し替える
+        引数1 obj：計測対象のオブジェクト
+        引数2 attr：メソッド名
+        引数3 key：区間名（同じ区間名の呼び出しは合算する）
+        """
+        func = getattr(obj, attr)
+        totals = self.totals
+        totals.setdefault(key, 0.0)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            totals[key] += time.perf_counter()-start
+            return result
+        setattr(obj, attr, timed)
+        self.wrapped.append((obj, attr))
+
+    def wrap_game(self, game):
+        """
+        ゲームの各グループのupdate/draw（update.グループ名，draw.グループ名），衝突判定（collide），
+        こうかとんの移動（update.bird），文字表示（draw.hud）を計測付きにする
+        """
+        for group in GROUPS:
+            self.wrap(getattr(game, group), "update", f"update.{group}")
+            self.wrap(getattr(game, group), "draw", f"draw.{group}")
+        self.wrap(game, "collide", "collide")
+        self.wrap(game.bird, "update", "update.bird")
+        for hud in HUDS:
+            self.wrap(getattr(game, hud), "update", "draw.hud")
+
+    def unwrap(self):
+        """
+        差し替えたメソッドを元に戻し，累積時間を消す
+        """
+        for obj, attr in self.wrapped:
+            delattr(obj, attr)
+        self.wrapped.clear()
+        self.totals.clear()
@@ -0,0 +1,145 @@
+"""
+ゲーム画面に重ねて表示する性能表示（F3キーで表示／非表示を切り替える）
+FPS，フレーム時間のグラフ，スプライトグループごとのupdate/draw時間，衝突判定の時間，
+HUD（スコア等の文字表示）の描画時間，グループごとのスプライト数を表示する
+
+計測はbenchmark.pyと同じinstrument.MethodTimerで，表示している間だけ各オブジェクトのメソッドを計測付きの関数に差し替え，
+非表示にしたらクラスのメソッドに戻す（非表示の間は計測のコストがかからない）
+"""
+import pygame as pg
+
+from instrument import GROUPS, MethodTimer
+
+
+class PerfOverlay:
+    """
+    性能表示に関するクラス
+    """
+    key = pg.K_F3  # 表示／非表示を切り替えるキー
+    refresh = 15  # 文字表示を作り直す間隔[フレーム]
+    graph_height = 80  # グラフの高さ[px]
+    graph_ms = 50  # グラフの上端のフレーム時間[ms]
+    width = 310  # 表示の幅[px]
+
+    def __init__(self, game, budget_ms: float, xy: tuple[int, int] = (1270, 10)):
+        """
+        引数1 game：計測するゲーム
+        引数2 budget_ms：1フレームの目標時間[ms]（グラフに線を引く）
+        引数3 xy：表示の左上の座標
+        """
+        self.game = game
+        self.budget_ms = budget_ms
+        self.xy = xy
+        self.enabled = False
+        self.font = pg.font.Font(None, 22)
+        self.timer = MethodTimer()  # timer.totalsは現在フレームでの区間ごとの累積時間[s]
+        self.average = {}  # 区間ごとの時間の移動平均[ms]
+        self.fps = 0.0
+        self.count = 0  # 表示してからのフレーム数
+        self.panel = None  # 文字表示のSurface（refreshフレームごとに作り直す）
+        self.graph = pg.Surface((__class__.width, __class__.graph_height), pg.SRCALPHA)  # フレーム時間のグラフ
+        self.drawn = None  # 前のフレームで表示した範囲
+        self.cleared = []  # このフレームで背景に戻した範囲
+
+    def toggle(self):
+        """
+        表示／非表示を切り替える
+        """
+        if self.enabled:
+            self.unwrap()
+        else:
+            self.wrap_all()
+            self.average.clear()
+            self.graph.fill((0, 0, 0, 170))
+            self.count = 0
+        self.enabled = not self.enabled
+
+    def wrap_all(self):
+        """
+        ゲームの各グループ，衝突判定，HUDの描画を計測付きにする
+        """
+        self.timer.wrap_game(self.game)
+        self.timer.wrap(self.game.bird, "draw", "draw.hud")  # こうかとんとHP，攻撃力の表示
+
+    def unwrap(self):
+        """
+        差し替えたメソッドを元に戻す
+        """
+        self.timer.unwrap()
+
+    def frame(self, clock: pg.time.Clock):
+        """
+        フレームの最後（clock.tickの後）に呼び，このフレームの計測値を集計する
+        引数 clock：メインループのpg.time.Clock
+        """
+        if not self.enabled:
+            return
+        self.fps = clock.get_fps()
+        self.plot(clock.get_time(), clock.get_rawtime())
+        average = self.average
+        totals = self.timer.totals
+        for key, sec in totals.items():
+            average[key] = average.get(key, sec*1000)*0.9+sec*100  # 直近10フレーム程度の移動平均
+            totals[key] = 0.0
+        self.count += 1
+
+    def clear(self, screen: pg.Surface, bg_img: pg.Surface):
+        """
+        前のフレームで表示した範囲を背景画像で塗り直す
+        """
+        if self.drawn is not None:
+            screen.blit(bg_img, self.drawn, self.drawn)
+            self.cleared.append(self.drawn)
+            self.drawn = None
+
+    def render(self) -> pg.Surface:
+        """
+        文字表示を半透明の下地に描いたSurfaceを作る（数値の列は右揃えにする）
+        """
+        game, average, font = self.game, self.average, self.font
+        rows = [(f"FPS {self.fps:.1f}   tick {game.tmr}   round {game.round.round}",),
+                ("collide", "", f"{average.get('collide', 0.0):.3f}", ""),
+                ("hud", "", "", f"{average.get('draw.hud', 0.0):.3f}"),
+                ("group [ms]", "n", "update", "draw")]
+        for group in GROUPS:
+            rows.append((group, str(len(getattr(game, group))),
+                         f"{average.get(f'update.{group}', 0.0):.3f}", f"{average.get(f'draw.{group}', 0.0):.3f}"))
+        panel = pg.Surface((__class__.width, 18*len(rows)+12), pg.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 6+18*i
+            panel.blit(font.render(row[0], True, (255, 255, 255)), (8, y))
+            for text, right in zip(row[1:], (150, 225, 300)):
+                img = font.render(text, True, (255, 255, 255))
+                panel.blit(img, (right-img.get_width(), y))
+        return panel
+
+    def plot(self, ms: float, raw: float):
+        """
+        フレーム時間のグラフを1フレーム分左へずらし，右端に新しい棒を描く
+        明るい棒はフレームの間隔，暗い棒はそのうち処理にかかった時間，黄色の線は目標時間
+        """
+        graph, h = self.graph, __class__.graph_height
+        scale = h/__class__.graph_ms
+        graph.scroll(-2, 0)
+        x = graph.get_width()-2
+        graph.fill((0, 0, 0, 170), (x, 0, 2, h))
+        graph.fill((0, 200, 0) if ms <= self.budget_ms else (230, 60, 60), (x, h-min(h, round(ms*scale)), 2, h))
+        graph.fill((0, 90, 200), (x, h-min(h, round(raw*scale)), 2, h))
+        graph.fill((255, 255, 0), (x, h-min(h, round(self.budget_ms*scale)), 2, 1))
+
+    def draw(self, screen: pg.Surface) -> list[pg.Rect]:
+        """
+        性能表示を画面に転送する
+        戻り値：前のフレームから変化した（pg.display.updateが必要な）範囲のRectのリスト
+        """
+        dirty, self.cleared = self.cleared, []
+        if not self.enabled:
+            return dirty
+        if self.panel is None or self.count%__class__.refresh == 0:
+            self.panel = self.render()
+        rect = screen.blit(self.panel, self.xy)
+        rect.union_ip(screen.blit(self.graph, rect.bottomleft))
+        self.drawn = rect
+        dirty.append(rect)
+        return dirty
@@ -0,0 +1,80 @@
+"""
+スプライトのオブジェクトプール
+消えたスプライト（kill()されたもの）を捨てずに取っておき，次に同じ種類のスプライトを
+作るときにreset()して使い回すことで，フレームごとのメモリ確保とGCの負担を減らす
+"""
+import pygame as pg
+
+
+class Pooled(pg.sprite.Sprite):
+    """
+    プールで使い回せるスプライトの基底クラス
+    サブクラスは__init__と同じ引数を取るreset()を持ち，状態をすべて初期化すること
+    （Pool.get()は使い回すスプライトのreset()を呼ぶ）
+    """
+    pool = None  # このスプライトを作ったプール（プールを通さずに作ったものはNone）
+    pooled = False  # プールの空きリストに入っているか
+
+    def kill(self):
+        """
+        すべてのグループから外し，プールから作ったものならプールに返す
+        """
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class Pool:
+    """
+    1種類のスプライトを使い回すためのプール
+    """
+    def __init__(self, cls: type, maxsize: int = 1024):
+        """
+        引数1 cls：プールするスプライトのクラス（Pooledのサブクラス）
+        引数2 maxsize：空きリストに取っておくスプライトの最大数
+        """
+        self.cls = cls
+        self.maxsize = maxsize
+        self.free = []
+        self.created = 0  # 新しく作った数
+        self.reused = 0  # 使い回した数
+        self.released = 0  # プールに返された数
+
+    def get(self, *args) -> Pooled:
+        """
+        空きリストにスプライトがあればreset(*args)して返し，なければcls(*args)で新しく作る
+        """
+        if self.free:
+            spr = self.free.pop()
+            spr.reset(*args)
+            self.reused += 1
+        else:
+            spr = self.cls(*args)
+            spr.pool = self
+            self.created += 1
+        spr.pooled = False
+        return spr
+
+    def release(self, spr: Pooled):
+        """
+        消えたスプライトを空きリストに戻す（同じスプライトを2回戻さない）
+        """
+        if spr.pooled:
+            return
+        self.released += 1
+        if len(self.free) < self.maxsize:
+            spr.pooled = True
+            self.free.append(spr)
+        else:  # 空きリストがいっぱいならプールから切り離して捨てる
+            spr.pool = None
+
+    def stats(self) -> dict[str, int]:
+        """
+        プールの統計（作った数，使い回した数，使用中の数，空きリストの数）を返す
+        """
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "in_use": self.created+self.reused-self.released,
+            "free": len(self.free),
+        }
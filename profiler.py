@@ -0,0 +1,99 @@
+"""
+ゲームのメインループのプロファイル（cProfile）を，ゲームの状況ごとに分けて取る
+状況（セグメント）はラウンドと，重力場・無敵状態・レーザー（敵のビーム）が出ているかの組み合わせで，
+セグメントごとに別のcProfile.Profileを持つ．計測するのはロジックの更新（tick）と描画の間だけで，
+描画回数を抑えるための待ち（clock.tick）やイベント待ちは計測しない
+終了時にセグメントごとの.pstatsと，関数ごとの時間（tottime）の上位N件のテキスト，
+ロジック1tickあたりと描画1回あたりの計測時間の一覧summary.txtを書き出す
+
+使い方：python kokaton_legend.py --profile prof --profile-top 30
+        python -m pstats prof/round05.pstats などで詳しく見られる
+"""
+import cProfile
+import io
+import os
+import pstats
+import time
+
+
+class SegmentProfiler:
+    """
+    ゲームの状況ごとにcProfileの計測を分けるクラス
+    """
+    def __init__(self, out: str, top: int = 25):
+        """
+        引数1 out：結果を書き出すディレクトリ
+        引数2 top：テキストに書き出す関数の数
+        """
+        self.out = out
+        self.top = top
+        self.profiles = {}  # セグメント名 → cProfile.Profile
+        self.counts = {}  # (セグメント名, 区間) → 計測した回数
+        self.seconds = {}  # (セグメント名, 区間) → 計測した時間の合計[s]
+        self.current = None  # 計測中の(セグメント名, 区間)
+        self.since = 0.0  # 計測を始めた時刻
+
+    @staticmethod
+    def segment(game) -> str:
+        """
+        ゲームの今の状況を表すセグメント名（例："round05+gravity+laser"）を返す
+        """
+        name = f"round{game.round.round:02d}"
+        if game.gravity:
+            name += "+gravity"
+        if game.bird.hyper_life > 0:
+            name += "+hyper"
+        if game.e_beam:
+            name += "+laser"
+        return name
+
+    def start(self, game, part: str):
+        """
+        ゲームの今の状況のプロファイラで計測を始める
+        引数1 game：ゲーム
+        引数2 part：計測する区間（"logic"：1tick分のロジックの更新，"draw"：1回分の描画）
+        """
+        self.stop()
+        name = __class__.segment(game)
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = cProfile.Profile()
+        self.current = name, part
+        self.since = time.perf_counter()
+        profile.enable()
+
+    def stop(self):
+        """
+        計測中のプロファイラを止め，区間の回数と時間を数える
+        """
+        if self.current is None:
+            return
+        self.profiles[self.current[0]].disable()
+        self.seconds[self.current] = self.seconds.get(self.current, 0.0)+time.perf_counter()-self.since
+        self.counts[self.current] = self.counts.get(self.current, 0)+1
+        self.current = None
+
+    def dump(self):
+        """
+        計測を止め，セグメントごとの結果と一覧を書き出す
+        """
+        self.stop()
+        if not self.profiles:
+            return
+        os.makedirs(self.out, exist_ok=True)
+        lines = [f"{'segment':<28}{'ticks':>8}{'ms/tick':>10}{'frames':>8}{'ms/frame':>10}{'seconds':>10}"]
+        for name in sorted(self.profiles):
+            path = os.path.join(self.out, name)
+            stats = pstats.Stats(self.profiles[name])
+            stats.dump_stats(f"{path}.pstats")
+            text = io.StringIO()
+            pstats.Stats(self.profiles[name], stream=text).strip_dirs().sort_stats("tottime").print_stats(self.top)
+            with open(f"{path}.txt", "w", encoding="utf-8") as f:
+                f.write(text.getvalue())
+            ticks, logic = self.counts.get((name, "logic"), 0), self.seconds.get((name, "logic"), 0.0)
+            frames, draw = self.counts.get((name, "draw"), 0), self.seconds.get((name, "draw"), 0.0)
+            lines.append(f"{name:<28}{ticks:>8}{logic*1000/ticks if ticks else 0:>10.3f}"
+                         f"{frames:>8}{draw*1000/frames if frames else 0:>10.3f}{logic+draw:>10.2f}")
+        with open(os.path.join(self.out, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines)+"\n")
+        print(f"profile: {len(self.profiles)} segments -> {os.path.join(self.out, 'summary.txt')}")
@@ -0,0 +1,91 @@
+"""
+弾（Bomb, Beam）をまとめて動かすスプライトグループ
+NumPyがあれば全弾の位置と1フレームの移動量を配列に持ち，移動と画面外判定を1回の配列演算で行う
+"""
+from collections import deque
+
+import pygame as pg
+
+try:
+    import numpy as np
+except ImportError:  # NumPyがなければ通常のグループと同じく1つずつ動かす
+    np = None
+
+
+class Projectiles(pg.sprite.RenderUpdates):
+    """
+    まっすぐ飛び，画面外に出たら消える弾のグループ
+    弾はrect，speed，vx，vyを持ち，update()でrect.move_ip(speed*vx, speed*vy)するものとする
+    配列の各行が1発の弾に対応し，弾が消えたら最後の行をその行に詰めるので，配列に隙間はできない
+    スプライトのRectも配列と同じだけ動かすので，描画と衝突判定は通常のグループと同じに使える
+    （グループに入っている間は，弾のRectを差し替えたり直接動かしたりしないこと）
+    """
+    def __init__(self, bound: tuple[int, int], *sprites: pg.sprite.Sprite):
+        """
+        引数1 bound：画面の（幅，高さ）．弾のRectがこの範囲からはみ出したら消す
+        引数2 sprites：最初から入れておく弾
+        """
+        self.bound = bound
+        self.order = []  # 配列の各行に対応する弾
+        self.index = {}  # 弾 → 配列の行
+        self.rects, self.dx, self.dy = [], [], []  # 各行の弾のRectと1フレームの移動量（Rectを動かす用）
+        if np is not None:
+            self.pos = np.zeros((64, 2), np.int64)  # 各弾のRectの左上座標
+            self.step = np.zeros((64, 2), np.int64)  # 各弾の1フレームの移動量
+            self.limit = np.zeros((64, 2), np.int64)  # 画面内に収まる左上座標の最大値
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite: pg.sprite.Sprite, layer=None):
+        """
+        弾をグループに加え，配列の最後の行に位置と移動量を書き込む
+        """
+        super().add_internal(sprite, layer)
+        if np is None:
+            return
+        n = len(self.order)
+        if n == len(self.pos):  # 配列がいっぱいなら2倍に広げる
+            self.pos, self.step, self.limit = (np.concatenate([arr, np.zeros_like(arr)])
+                                               for arr in (self.pos, self.step, self.limit))
+        rect, mv = sprite.rect, pg.Rect(0, 0, 0, 0)
+        mv.move_ip(sprite.speed*sprite.vx, sprite.speed*sprite.vy)  # Rect.move_ipと同じく整数に切り捨てる
+        self.pos[n] = rect.topleft
+        self.step[n] = mv.topleft
+        self.limit[n] = self.bound[0]-rect.width, self.bound[1]-rect.height
+        self.index[sprite] = n
+        self.order.append(sprite)
+        self.rects.append(rect)
+        self.dx.append(mv.x)
+        self.dy.append(mv.y)
+
+    def remove_internal(self, sprite: pg.sprite.Sprite):
+        """
+        弾をグループから外し，配列の最後の行を空いた行に詰める
+        """
+        super().remove_internal(sprite)
+        n = self.index.pop(sprite, None)
+        if n is None:
+            return
+        last, rect, dx, dy = self.order.pop(), self.rects.pop(), self.dx.pop(), self.dy.pop()
+        if last is not sprite:
+            k = len(self.order)
+            self.order[n], self.rects[n], self.dx[n], self.dy[n] = last, rect, dx, dy
+            self.index[last] = n
+            self.pos[n], self.step[n], self.limit[n] = self.pos[k], self.step[k], self.limit[k]
+
+    def update(self, *args, **kwargs):
+        """
+        全弾を1フレーム分動かし，画面外に出た弾を消す
+        NumPyがなければ各弾のupdate()を呼ぶ
+        """
+        if np is None:
+            super().update(*args, **kwargs)
+            return
+        n = len(self.order)
+        if not n:
+            return
+        pos = self.pos[:n]
+        pos += self.step[:n]
+        out = ((pos < 0) | (pos > self.limit[:n])).any(axis=1)
+        deque(map(pg.Rect.move_ip, self.rects, self.dx, self.dy), maxlen=0)  # Pythonのループを回さずに全Rectを動かす
+        for spr in [self.order[i] for i in np.flatnonzero(out).tolist()]:
+            spr.kill()
@@ -0,0 +1,142 @@
+"""
+操作の記録と再生
+1ゲーム分の乱数シードと，ロジック更新（tick）ごとの押下キーとキー入力イベントを小さなバイナリファイルに書き出し，
+同じ乱数シードと操作でゲームを進め直すことで，記録したゲームをビット単位で同じに再現する
+
+ファイルの形式（リトルエンディアン）：
+  ヘッダ：b"KKRP"，バージョン(u8)，乱数シード(u64)，ゲームモードの名前の長さ(u8)，名前(UTF-8)
+  （バージョン1のファイルにはゲームモードの名前がない）
+  tickごと：押下キーのビット列(u8)，イベント数(u8)，押されたキー(u32)×イベント数
+  終端：0xFF，tick数(u32)，終了時の状態のダイジェスト(u32)，
+        最後のtickの後に処理されたイベント数(u8)，押されたキー(u32)×イベント数（バージョン3から）
+"""
+import struct
+
+import pygame as pg
+
+
+MAGIC = b"KKRP"
+VERSION = 3
+END = 0xFF  # 終端の印（押下キーのビット列としては使わない値）
+HEADER = struct.Struct("<4sBQ")
+NAME = struct.Struct("<B")
+TICK = struct.Struct("<BB")
+KEY = struct.Struct("<I")
+FOOTER = struct.Struct("<II")
+
+
+class KeyState:
+    """
+    pg.key.get_pressed()の代わりに，記録した押下キーを返すクラス
+    """
+    def __init__(self, keys: list[int], mask: int):
+        """
+        引数1 keys：記録対象のキーのリスト（i番目のキーがビット列のi番目のビットに対応する）
+        引数2 mask：押下キーのビット列
+        """
+        self.pressed = {key for i, key in enumerate(keys) if mask >> i & 1}
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+class Recorder:
+    """
+    ゲームの操作をtickごとにファイルへ書き出すクラス
+    書き込みはファイルのバッファにためてまとめて行うので，1tickごとにディスクへは書かない
+    """
+    def __init__(self, path: str, seed: int, mode: str, keys: list[int]):
+        """
+        引数1 path：書き出すファイルのパス
+        引数2 seed：ゲームの乱数シード
+        引数3 mode：ゲームモードの名前（再生するときに同じモードか確かめる）
+        引数4 keys：記録対象のキーのリスト（8個まで）
+        """
+        self.keys = keys
+        self.events = []  # 次のtickの前に処理されたイベントのキー
+        self.file = open(path, "wb")
+        name = mode.encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed) + NAME.pack(len(name)) + name)
+
+    def event(self, event: pg.event.Event):
+        """
+        ゲームが処理したイベントを，次のtickの記録に加える
+        """
+        if event.type == pg.KEYDOWN:
+            self.events.append(event.key)
+
+    def tick(self, key_lst: list[bool]):
+        """
+        これから進める1tick分の押下キーと，それまでにたまったイベントを書き出す
+        引数 key_lst：このtickで使う押下キーの真理値リスト
+        """
+        mask = 0
+        for i, key in enumerate(self.keys):
+            if key_lst[key]:
+                mask |= 1 << i
+        events = self.events[:255]
+        self.file.write(TICK.pack(mask, len(events)) + b"".join(KEY.pack(key) for key in events))
+        self.events.clear()
+
+    def close(self, ticks: int, digest: int):
+        """
+        終端を書いてファイルを閉じる
+        引数1 ticks：ゲームを進めたtick数
+        引数2 digest：終了時のゲームの状態のダイジェスト（再生時の照合用）
+        """
+        events = self.events[:255]  # 最後のtickの後（ウィンドウを閉じる前など）に処理されたもの
+        self.file.write(bytes([END]) + FOOTER.pack(ticks, digest) + bytes([len(events)])
+                        + b"".join(KEY.pack(key) for key in events))
+        self.events.clear()
+        self.file.close()
+
+
+class Replay:
+    """
+    記録ファイルを読み込み，tickごとの(押下キー, イベントのキーのリスト)を返すクラス
+    """
+    def __init__(self, path: str, keys: list[int]):
+        """
+        引数1 path：記録ファイルのパス
+        引数2 keys：記録対象のキーのリスト（記録したときと同じもの）
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            raise ValueError(f"{path}は対応していない記録ファイルです")
+        pos = HEADER.size
+        self.mode = None  # 記録したゲームモードの名前（バージョン1のファイルではNone）
+        if version >= 2:
+            n, = NAME.unpack_from(data, pos)
+            self.mode = data[pos+NAME.size:pos+NAME.size+n].decode("utf-8")
+            pos += NAME.size+n
+        self.ticks = []  # tickごとの(KeyState, イベントのキーのリスト)
+        self.end = None  # 記録時の(tick数, ダイジェスト)．途中で終わっているファイルならNone
+        self.tail = []  # 最後のtickの後に処理されたイベントのキーのリスト
+        states = {}  # 押下キーのビット列 → KeyState（同じものを使い回す）
+        while pos < len(data):
+            if data[pos] == END:
+                pos += 1
+                if pos+FOOTER.size <= len(data):
+                    self.end = FOOTER.unpack_from(data, pos)
+                    pos += FOOTER.size
+                if version >= 3 and pos < len(data):
+                    n = data[pos]
+                    self.tail = [KEY.unpack_from(data, pos+1+KEY.size*i)[0] for i in range(n)]
+                break
+            if pos+TICK.size > len(data) or pos+TICK.size+KEY.size*data[pos+1] > len(data):
+                break  # 記録の途中で終わっている（書き込み中に強制終了したなど）
+            mask, n = TICK.unpack_from(data, pos)
+            pos += TICK.size
+            events = [KEY.unpack_from(data, pos+KEY.size*i)[0] for i in range(n)]
+            pos += KEY.size*n
+            if mask not in states:
+                states[mask] = KeyState(keys, mask)
+            self.ticks.append((states[mask], events))
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __getitem__(self, tick: int) -> tuple[KeyState, list[int]]:
+        return self.ticks[tick]
@@ -0,0 +1,210 @@
+"""
+スプライト同士の衝突判定を速くする空間ハッシュ
+画面を格子に区切り，同じマスに重なるスプライトだけを矩形判定の候補にする
+"""
+import pygame as pg
+
+
+class SpatialHash:
+    """
+    画面を一辺cellピクセルの正方形のマスに区切り，各マスに重なるスプライトを登録しておくクラス
+    マスごとにスプライトとそのRectのリストを持ち，Rectの判定はRect.collidelistallでまとめて行う
+    """
+    def __init__(self, sprites: list[pg.sprite.Sprite], cell: int = 128):
+        """
+        引数1 sprites：登録するスプライトのリスト
+        引数2 cell：マスの一辺の長さ[px]
+        """
+        self.cell = cell
+        self.cells = {}  # (列, 行) → (Rectのリスト, スプライトのリスト)
+        self.members = set(sprites)
+        cells = self.cells
+        for spr in sprites:
+            rect = spr.rect
+            key = (rect.left//cell, rect.top//cell)
+            if key == ((rect.right-1)//cell, (rect.bottom-1)//cell) and rect.width and rect.height:  # 1マスに収まる
+                entry = cells.get(key)
+                if entry is None:
+                    cells[key] = ([rect], [spr])
+                else:
+                    entry[0].append(rect)
+                    entry[1].append(spr)
+            else:
+                self._insert(spr)
+
+    def add(self, spr: pg.sprite.Sprite):
+        """
+        スプライトを追加で登録する
+        """
+        self.members.add(spr)
+        self._insert(spr)
+
+    def _insert(self, spr: pg.sprite.Sprite):
+        """
+        スプライトを，そのRectが重なるすべてのマスに登録する
+        """
+        rect, cell, cells = spr.rect, self.cell, self.cells
+        if not rect.width or not rect.height:  # 大きさ0のRectは何とも衝突しない
+            return
+        for cx in range(rect.left//cell, (rect.right-1)//cell+1):
+            for cy in range(rect.top//cell, (rect.bottom-1)//cell+1):
+                entry = cells.get((cx, cy))
+                if entry is None:
+                    entry = cells[cx, cy] = ([], [])
+                entry[0].append(rect)
+                entry[1].append(spr)
+
+    def query(self, rect: pg.Rect) -> list[pg.sprite.Sprite]:
+        """
+        rectと重なる登録済みスプライトを重複なしで返す
+        """
+        c, cells = self.cell, self.cells
+        x0, x1 = rect.left//c, (rect.right-1)//c
+        y0, y1 = rect.top//c, (rect.bottom-1)//c
+        if x0 == x1 and y0 == y1:  # 1マスに収まる場合（ほとんどのスプライト）は重複を気にしなくてよい
+            entry = cells.get((x0, y0))
+            if entry is None:
+                return []
+            sprs = entry[1]
+            return [sprs[i] for i in rect.collidelistall(entry[0])]
+        found = {}
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                entry = cells.get((cx, cy))
+                if entry is not None:
+                    sprs = entry[1]
+                    for i in rect.collidelistall(entry[0]):
+                        found[sprs[i]] = None
+        return list(found)
+
+
+class Collider:
+    """
+    1フレーム分の衝突判定をまとめて受け持つクラス
+    グループごとの空間ハッシュをフレームに1回だけ作り，同じフレームの判定で使い回す
+    （フレームの途中でグループに加わったスプライトは，次に使うときにハッシュへ追加する）
+    片方のグループがsmall個以下なら，ハッシュを作るより速いのでRect.collidelistallで総当たりする
+    brute_forceをTrueにすると，比較用に常にpg.sprite.groupcollide/spritecollideをそのまま使う
+    """
+    def __init__(self, brute_force: bool = False, cell: int = 128, small: int = 16):
+        """
+        引数1 brute_force：Trueなら空間ハッシュを使わずpg.spriteの関数で総当たりする
+        引数2 cell：空間ハッシュのマスの一辺の長さ[px]
+        引数3 small：空間ハッシュを使わずに判定するグループの大きさの上限
+        """
+        self.brute_force = brute_force
+        self.cell = cell
+        self.small = small
+        self.grids = {}
+
+    def begin(self):
+        """
+        フレームの最初に呼び，前のフレームの空間ハッシュを捨てる
+        """
+        self.grids.clear()
+
+    def grid(self, group: pg.sprite.AbstractGroup) -> SpatialHash:
+        """
+        groupの空間ハッシュを返す（このフレームでまだ作っていなければ作る）
+        """
+        grid = self.grids.get(group)
+        if grid is None:
+            grid = self.grids[group] = SpatialHash(group.sprites(), self.cell)
+        else:
+            for spr in group.spritedict:  # 作った後に加わったスプライト（再生で結果が変わらないようグループの順に足す）
+                if spr not in grid.members:
+                    grid.add(spr)
+        return grid
+
+    def spritecollide(self, sprite: pg.sprite.Sprite, group: pg.sprite.AbstractGroup, dokill: bool) -> list[pg.sprite.Sprite]:
+        """
+        pg.sprite.spritecollideと同じく，spriteと衝突しているgroupのスプライトのリストを返す
+        1回だけの問い合わせにハッシュを作ると割に合わないので，Rect.collidelistallで一度に判定する
+        引数1 sprite：判定するスプライト
+        引数2 group：判定されるグループ
+        引数3 dokill：Trueなら衝突したgroupのスプライトを消す
+        """
+        if self.brute_force:
+            return pg.sprite.spritecollide(sprite, group, dokill)
+        sprs = group.sprites()
+        hits = [sprs[i] for i in sprite.rect.collidelistall([spr.rect for spr in sprs])]
+        if dokill:
+            for spr in hits:
+                spr.kill()
+        return hits
+
+    @staticmethod
+    def scan_all(group: pg.sprite.AbstractGroup, targets: pg.sprite.AbstractGroup):
+        """
+        groupの各スプライトについてtargetsの全スプライトとの衝突をRect.collidelistallで調べ，
+        衝突するものがあれば(スプライト, 衝突したスプライトのリスト)を順に返す
+        """
+        sprs = targets.sprites()
+        rects = [spr.rect for spr in sprs]
+        for spr in group.sprites():
+            idx = spr.rect.collidelistall(rects)
+            if idx:
+                yield spr, [sprs[i] for i in idx]
+
+    @staticmethod
+    def scan(group: pg.sprite.AbstractGroup, grid: SpatialHash):
+        """
+        groupの各スプライトで空間ハッシュgridを引き，衝突するものがあれば(スプライト, 衝突したスプライトのリスト)を順に返す
+        ほとんどのスプライトは1マスに収まるので，その場合はここで直接マスを引いて呼び出しの手間を省く
+        """
+        c, cells = grid.cell, grid.cells
+        for spr in group.sprites():
+            rect = spr.rect
+            key = (rect.left//c, rect.top//c)
+            if key == ((rect.right-1)//c, (rect.bottom-1)//c):
+                entry = cells.get(key)
+                if entry is None:
+                    continue
+                sprs = entry[1]
+                hits = [sprs[i] for i in rect.collidelistall(entry[0])]
+            else:
+                hits = grid.query(rect)
+            if hits:
+                yield spr, hits
+
+    def groupcollide(self, group1: pg.sprite.AbstractGroup, group2: pg.sprite.AbstractGroup,
+                     dokill1: bool, dokill2: bool) -> dict[pg.sprite.Sprite, list[pg.sprite.Sprite]]:
+        """
+        pg.sprite.groupcollideと同じく，group1のスプライトをキー，衝突したgroup2のスプライトのリストを値とする辞書を返す
+        少ない方のグループの空間ハッシュ（十分少なければRectのリスト）を作り，
+        多い方のグループのスプライトで引いて衝突の組を集め，
+        最後にgroup1の順に消す処理を行うので，結果はpg.sprite.groupcollideと同じになる
+        引数1 group1：判定するグループ
+        引数2 group2：判定されるグループ
+        引数3 dokill1：Trueなら衝突したgroup1のスプライトを消す
+        引数4 dokill2：Trueなら衝突したgroup2のスプライトを消す
+        """
+        if not group1 or not group2:
+            return {}
+        if self.brute_force:
+            return pg.sprite.groupcollide(group1, group2, dokill1, dokill2)
+        pairs = {}  # group1のスプライト → 衝突するgroup2のスプライトのリスト
+        if len(group1) >= len(group2):
+            scan = self.scan_all(group1, group2) if len(group2) <= self.small else self.scan(group1, self.grid(group2))
+            for spr, hits in scan:
+                pairs[spr] = hits
+        else:
+            members1 = group1.spritedict
+            scan = self.scan_all(group2, group1) if len(group1) <= self.small else self.scan(group2, self.grid(group1))
+            for other, hits in scan:
+                for spr in hits:
+                    if spr in members1:
+                        pairs.setdefault(spr, []).append(other)
+        crashed = {}
+        members2 = group2.spritedict
+        for spr in group1.sprites():
+            if spr in pairs:
+                hits = [other for other in pairs[spr] if other in members2]  # このフレームで既に消えたものは除く
+                if hits:
+                    crashed[spr] = hits
+                    if dokill2:
+                        for other in hits:
+                            other.kill()
+                    if dokill1:
+                        spr.kill()
+        return crashed
@@ -0,0 +1,147 @@
+"""
+フレームごとの計測値の記録（テレメトリ）
+描画1回（フレーム）ごとに，フレーム時間，clock.get_rawtime()，ロジックと描画の時間，グループごとのスプライト数，
+ラウンド，GCの回数と時間をメモリ上のリングバッファに貯め，batchフレームごとにまとめてファイルへ書き出す
+（1フレームごとにはファイルへ書かない）．ファイルが大きくなったら path.1，path.2 … へずらして新しいファイルに書く
+
+形式はパスの拡張子で決める：.csvならCSV，それ以外はJSON Lines（1行に1フレームのJSON）
+"""
+import csv
+import gc
+import io
+import json
+import os
+import time
+from collections import deque
+
+from instrument import GROUPS
+
+
+class Telemetry:
+    """
+    フレームごとの計測値を貯めて，まとめてファイルへ書き出すクラス
+    """
+    def __init__(self, path: str, budget_ms: float, capacity: int = 4096, batch: int = 500,
+                 max_bytes: int = 8*1024*1024, backups: int = 3):
+        """
+        引数1 path：書き出すファイルのパス
+        引数2 budget_ms：1フレームの処理時間の上限[ms]（ロジックと描画の時間の合計がこれを超えたフレームにover=1を付ける）
+        引数3 capacity：リングバッファに貯めるフレーム数の上限（書き出せなかった古いものから捨てる）
+        引数4 batch：何フレームごとにファイルへ書き出すか
+        引数5 max_bytes：ファイルがこの大きさを超えたら次のファイルに切り替える
+        引数6 backups：残しておく古いファイルの数
+        """
+        self.path = path
+        self.csv = path.lower().endswith(".csv")
+        self.budget_ms = budget_ms
+        self.batch = batch
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.fields = (["frame", "time", "tick", "round", "ticks", "frame_ms", "raw_ms", "logic_ms", "draw_ms", "over",
+                        "gc0", "gc1", "gc2", "gc_ms"] + [f"n_{group}" for group in GROUPS])
+        self.buffer = deque(maxlen=capacity)  # 各フレームの計測値のタプル（fieldsの順）
+        self.pending = 0  # バッファのうち，まだ書き出していないフレーム数
+        self.frames = 0
+        self.over = 0  # 目標時間を超えたフレーム数
+        self.dropped = 0  # 書き出せずに捨てたフレーム数
+        self.start = time.perf_counter()
+        self.gc_counts = [0, 0, 0]  # 前のフレームからの世代ごとのGCの回数
+        self.gc_sec = 0.0  # 前のフレームからのGCの時間[s]
+        self.gc_start = 0.0
+        self.file = None
+        self.open()
+        gc.callbacks.append(self.on_gc)
+
+    def on_gc(self, phase: str, info: dict):
+        """
+        GCの開始と終了のたびに呼ばれ，回数と時間を数える（gc.callbacks）
+        """
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        else:
+            self.gc_sec += time.perf_counter()-self.gc_start
+            self.gc_counts[info["generation"]] += 1
+
+    def record(self, game, clock, logic: float, draw: float, ticks: int):
+        """
+        1フレーム分の計測値をバッファに加える（描画ループのclock.tickの後に呼ぶ）
+        引数1 game：ゲーム
+        引数2 clock：描画ループのpg.time.Clock
+        引数3 logic：このフレームでイベント処理とロジックの更新にかかった時間[s]
+        引数4 draw：このフレームで描画にかかった時間[s]
+        引数5 ticks：このフレームで進めたロジックの更新回数
+        """
+        frame_ms = clock.get_time()
+        over = (logic+draw)*1000 > self.budget_ms
+        counts = self.gc_counts
+        self.buffer.append((self.frames, round(time.perf_counter()-self.start, 4), game.tmr, game.round.round, ticks,
+                            frame_ms, clock.get_rawtime(), round(logic*1000, 3), round(draw*1000, 3), int(over),
+                            *counts, round(self.gc_sec*1000, 3), *[len(getattr(game, group)) for group in GROUPS]))
+        self.gc_counts = [0, 0, 0]
+        self.gc_sec = 0.0
+        self.frames += 1
+        self.over += over
+        self.pending += 1
+        if self.pending >= self.batch:
+            self.flush()
+
+    def open(self):
+        """
+        書き出すファイルを開く（CSVで新しいファイルなら見出しの行を書く）
+        """
+        self.file = open(self.path, "a", newline="", encoding="utf-8")
+        if self.csv and self.file.tell() == 0:
+            csv.writer(self.file).writerow(self.fields)
+
+    def rotate(self):
+        """
+        今のファイルをpath.1に，path.1をpath.2に…とずらし，新しいファイルを開く
+        """
+        self.file.close()
+        for i in range(self.backups-1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i+1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.open()
+
+    def flush(self):
+        """
+        まだ書き出していないフレームをまとめてファイルへ書き出す
+        書き出しに失敗しても（ディスクがいっぱいなど）ゲームは止めず，そのフレームは捨てる
+        """
+        n = min(self.pending, len(self.buffer))
+        self.dropped += self.pending-n  # 書き出す前にリングバッファからあふれた分
+        self.pending = 0
+        if not n or self.file is None:
+            return
+        rows = list(self.buffer)[-n:]
+        out = io.StringIO()
+        if self.csv:
+            csv.writer(out).writerows(rows)
+        else:
+            fields = self.fields
+            out.writelines(json.dumps(dict(zip(fields, row)), separators=(",", ":"))+"\n" for row in rows)
+        try:
+            self.file.write(out.getvalue())
+            self.file.flush()
+            if self.file.tell() >= self.max_bytes:
+                self.rotate()
+        except OSError as e:
+            print(f"telemetry: failed to write {self.path} ({e})")
+            self.dropped += n
+
+    def close(self):
+        """
+        残りを書き出してファイルを閉じ，記録の概要を表示する
+        """
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        print(f"telemetry: {self.frames} frames, {self.over} over {self.budget_ms:.1f} ms, "
+              f"{self.dropped} dropped -> {self.path}")